@@ -3,7 +3,7 @@ This module implements a generic Breadth-First Search algorithm
 that can be used for state space exploration.
 """
 
-from collections import deque
+from array import array
 from typing import Set, List, Dict, Any
 
 
@@ -12,17 +12,76 @@ class BFS:
     Breadth-First Search implementation for exploring state spaces.
     
     This is a generic implementation that works with any state type.
-    It tracks visited states, builds a graph, and maintains parent pointers
-    for path reconstruction.
+    It tracks visited states and maintains parent pointers for path
+    reconstruction. The explored graph is only kept when build_graph is set.
+    With intrusive_parent, parent pointers are stored on the states
+    themselves (state.parent) instead of the self.parent dict.
+    BFS depths are only recorded when track_depth is set; distance()
+    otherwise walks the parent pointers.
+    
+    Call reset() to reuse an instance for a new exploration.
+    explore() is level-synchronous: it expands the whole current level
+    (a list) while collecting the next one, so every state of a level
+    shares the same depth.
     """
     
-    def __init__(self):
-        """Initialize BFS data structures"""
+    def __init__(self, build_graph: bool = False, intrusive_parent: bool = False,
+                 track_depth: bool = False):
+        """
+        Initialize BFS data structures
+        
+        Args:
+            build_graph: If True, store each state's successor list in
+                        self.graph during exploration
+            intrusive_parent: If True, record the discoverer of each state
+                             in its writable 'parent' attribute, saving one
+                             dict insertion per visited state
+            track_depth: If True, record the depth of every visited state:
+                        in self.depth, or with dense ids in self.depth_ids
+                        (an int array indexed by id, -1 if not visited)
+        """
+        self.build_graph = build_graph
+        self.intrusive_parent = intrusive_parent
+        self.track_depth = track_depth
         self.visited: Set[Any] = set()
         self.graph: Dict[Any, List[Any]] = {}
         self.parent: Dict[Any, Any] = {}
-    
-    def explore(self, initial_state, get_successors_func):
+        self.depth: Dict[Any, int] = {}
+        self.depth_ids = array('i')
+        self.visited_ids = bytearray()
+        # True once an exploration may have marked self.visited_ids
+        self._ids_dirty = False
+        self._root: Any = None
+        self._state_id_func = None
+        self.goal: Any = None
+        self._state_count = 0
+        self._edge_count = 0
+    
+    def reset(self, visited_capacity: int = 0):
+        """
+        Forget the previous exploration so the instance can be reused.
+        
+        Args:
+            visited_capacity: Size of the dense-id visited marker to keep
+                             ready for explore(..., n_states=visited_capacity)
+        """
+        self.visited.clear()
+        self.graph.clear()
+        self.parent.clear()
+        self.depth.clear()
+        self.depth_ids = array('i')
+        self.goal = None
+        self._state_count = 0
+        self._edge_count = 0
+        # A fresh marker only when the old one was used or has the wrong
+        # size: no scan of the bytearray to find out
+        if len(self.visited_ids) != visited_capacity or self._ids_dirty:
+            self.visited_ids = bytearray(visited_capacity)
+            self._ids_dirty = False
+    
+    def explore(self, initial_state, get_successors_func,
+                state_id_func=None, n_states=0, is_goal=None,
+                stop_at_goal=True, on_expand=None):
         """
         Explore state space starting from initial_state using BFS.
         
@@ -30,64 +89,209 @@ class BFS:
             initial_state: The starting state for exploration
             get_successors_func: Function that takes a state and returns 
                                list of successor states
+            state_id_func: Optional function mapping a state to a dense
+                          integer id in [0, n_states). When given, visited
+                          states are marked in a bytearray (self.visited_ids)
+                          instead of the self.visited set
+            n_states: Size of the state id range used with state_id_func
+            is_goal: Optional predicate on states. The first state
+                    satisfying it is stored in self.goal
+            stop_at_goal: If True, exploration stops as soon as the goal
+                         is discovered
+            on_expand: Optional callback on_expand(state, successors) called
+                      once per expanded state with its successor list, so
+                      checks can run during the exploration itself
         
         Returns:
-            Dictionary with exploration statistics:
+            Dictionary with exploration statistics (both counts accumulate
+            across explore() calls until reset(), whichever visited marker
+            is used):
             - total_states: Number of states visited
             - total_transitions: Number of edges in the graph
         """
-        queue = deque([initial_state])
-        self.visited.add(initial_state)
-        self.parent[initial_state] = None
-        self.graph[initial_state] = []
+        level = [initial_state]
+        stopped = False
+        intrusive = self.intrusive_parent
+        parent = self.parent
+        if intrusive:
+            initial_state.parent = None
+        else:
+            parent[initial_state] = None
+        self._root = initial_state
+        self._state_id_func = state_id_func
+        record_depth = self._depth_recorder(state_id_func, n_states)
+        if record_depth is not None:
+            record_depth(initial_state, 0)
+        build_graph = self.build_graph
+        edges = 0
+        self.goal = None
+        
+        if is_goal is not None and is_goal(initial_state):
+            self.goal = initial_state
+            is_goal = None
+            if stop_at_goal:
+                # Nothing to search: the root is already a goal
+                level = []
         
-        while queue:
-            current = queue.popleft()
+        mark = self._marker(state_id_func, n_states)
+        new_states = int(mark(initial_state))
+        next_depth = 0
+        
+        while level:
+            next_depth += 1
+            next_level = []
             
-            # Get successors using provided function
-            successors = get_successors_func(current)
-            self.graph[current] = successors
+            for current in level:
+                # Get successors using provided function
+                successors = get_successors_func(current)
+                edges += len(successors)
+                if build_graph:
+                    self.graph[current] = successors
+                if on_expand is not None:
+                    on_expand(current, successors)
+                
+                # Process each successor
+                for successor in successors:
+                    if mark(successor):
+                        new_states += 1
+                        if intrusive:
+                            successor.parent = current
+                        else:
+                            parent[successor] = current
+                        if record_depth is not None:
+                            record_depth(successor, next_depth)
+                        if is_goal is not None and is_goal(successor):
+                            # Only the first goal found is kept
+                            self.goal = successor
+                            is_goal = None
+                            if stop_at_goal:
+                                stopped = True
+                                break
+                        next_level.append(successor)
+                if stopped:
+                    break
             
-            # Process each successor
-            for successor in successors:
-                if successor not in self.visited:
-                    self.visited.add(successor)
-                    self.parent[successor] = current
-                    queue.append(successor)
+            level = [] if stopped else next_level
+        
+        self._state_count += new_states
+        self._edge_count += edges
         
         return {
-            'total_states': len(self.visited),
-            'total_transitions': sum(len(v) for v in self.graph.values())
+            'total_states': self._state_count,
+            'total_transitions': self._edge_count
         }
     
+    def _marker(self, state_id_func, n_states):
+        """
+        Visited marker of an exploration: mark(state) marks state as
+        visited and returns True if it was not visited yet.
+        
+        Without state_id_func the marker is the self.visited set. With
+        dense ids it is one byte per possible state (self.visited_ids),
+        so marking hashes nothing; the bytearray prepared by reset() is
+        reused when it has the right size.
+        """
+        if state_id_func is None:
+            visited = self.visited
+            add = visited.add
+            
+            def mark(state):
+                if state in visited:
+                    return False
+                add(state)
+                return True
+        else:
+            if len(self.visited_ids) != n_states:
+                self.visited_ids = bytearray(n_states)
+            visited_ids = self.visited_ids
+            self._ids_dirty = True
+            
+            def mark(state):
+                idx = state_id_func(state)
+                if visited_ids[idx]:
+                    return False
+                visited_ids[idx] = 1
+                return True
+        return mark
+    
+    def _depth_recorder(self, state_id_func, n_states):
+        """
+        record(state, depth) storing BFS depths when track_depth is set
+        (None otherwise): in self.depth, or with dense ids in the
+        self.depth_ids array, so recording a depth hashes nothing.
+        """
+        if not self.track_depth:
+            return None
+        if state_id_func is None:
+            depth = self.depth
+            
+            def record(state, d):
+                depth[state] = d
+        else:
+            if len(self.depth_ids) != n_states:
+                self.depth_ids = array('i', [-1]) * n_states
+            depth_ids = self.depth_ids
+            
+            def record(state, d):
+                depth_ids[state_id_func(state)] = d
+        return record
+    
+    def _chain(self, state):
+        """States from state back to its root, following parent pointers"""
+        chain = []
+        if self.intrusive_parent:
+            while state is not None:
+                chain.append(state)
+                state = state.parent
+        else:
+            get_parent = self.parent.get
+            while state is not None:
+                chain.append(state)
+                state = get_parent(state)
+        return chain
+    
+    def distance(self, state) -> int:
+        """
+        Number of transitions from the root of the exploration to state.
+        
+        Read from the recorded depths with track_depth, otherwise counted
+        along the parent pointers (with intrusive_parent, state must be
+        the instance that was discovered by explore(), e.g. self.goal).
+        
+        Returns:
+            BFS depth of state, or -1 if it was not visited
+        """
+        if self.track_depth:
+            if self._state_id_func is not None:
+                return self.depth_ids[self._state_id_func(state)]
+            return self.depth.get(state, -1)
+        if not self.intrusive_parent and state not in self.parent:
+            return -1
+        chain = self._chain(state)
+        return len(chain) - 1 if chain[-1] == self._root else -1
+    
     def get_path(self, start, end):
         """
         Reconstruct path from start to end using parent pointers.
         
         Args:
             start: Starting state
-            end: Target state
+            end: Target state (with intrusive_parent, the instance that was
+                 discovered by explore(), e.g. self.goal)
         
         Returns:
             List of states forming the path from start to end,
             or empty list if no path exists
         """
-        if end not in self.visited:
+        if not self.intrusive_parent and end not in self.parent:
             return []
         
-        path = []
-        current = end
-        
         # Backtrack from end to start using parent pointers
-        while current is not None:
-            path.append(current)
-            current = self.parent.get(current)
-        
-        # Reverse to get path from start to end
+        path = self._chain(end)
         path.reverse()
         
         # Verify the path starts at the correct state
-        return path if path and path[0] == start else []
+        return path if path[0] == start else []
 
 
 # =============================================================================
@@ -261,6 +465,44 @@ def test_disconnected_nodes():
     return True
 
 
+def test_dense_state_ids():
+    """Test 5: Visited marker indexed by dense state ids"""
+    print("=" * 70)
+    print("TEST 5: Dense State Ids (bytearray visited)")
+    print("=" * 70)
+    
+    # Same structure as test 3, states are already dense integers
+    graph = {
+        0: [1, 2],
+        1: [3, 4],
+        2: [5],
+        3: [6],
+        4: [6],
+        5: [6],
+        6: []
+    }
+    
+    def get_successors(state):
+        return graph.get(state, [])
+    
+    bfs = BFS()
+    stats = bfs.explore(0, get_successors,
+                        state_id_func=lambda state: state, n_states=7)
+    
+    print(f"\nVisited ids: {list(bfs.visited_ids)}")
+    print(f"Total states: {stats['total_states']}")
+    
+    path = bfs.get_path(0, 6)
+    print(f"Shortest path 0 -> 6: {path}")
+    
+    assert stats['total_states'] == 7, "Should visit 7 states"
+    assert sum(bfs.visited_ids) == 7, "Every id should be marked once"
+    assert path == [0, 1, 3, 6], "Shortest path should be 0->1->3->6"
+    
+    print("\n✓ Test passed!\n")
+    return True
+
+
 def run_all_tests():
     """Run all BFS tests"""
     print("\n" + "#" * 70)
@@ -272,7 +514,8 @@ def run_all_tests():
         ("Simple Acyclic Graph", test_simple_graph),
         ("Cyclic Graph", test_cyclic_graph),
         ("Complex Graph", test_complex_graph),
-        ("Disconnected Nodes", test_disconnected_nodes)
+        ("Disconnected Nodes", test_disconnected_nodes),
+        ("Dense State Ids", test_dense_state_ids)
     ]
     
     results = []
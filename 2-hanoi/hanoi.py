@@ -4,6 +4,7 @@ algorithm from bfs to find optimal solutions.
 """
 
 import sys
+from functools import lru_cache
 from pathlib import Path
 # Add parent directory to import from 1-bfs
 sys.path.insert(0, str(Path(__file__).parent.parent / "1-bfs"))
@@ -12,42 +13,137 @@ from bfs import BFS
 from typing import Tuple, List
 
 
+# Powers of 3 used by HanoiState.state_id (one base-3 digit per disk)
+_POW3 = tuple(3 ** k for k in range(16))
+
+# The 6 (from_peg, to_peg) moves between two distinct pegs
+_MOVES = ((0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1))
+
+
+@lru_cache(maxsize=None)
+def _build_compiled_succ():
+    """
+    Build the function returned by HanoiGame._compile_succ (the same for
+    every n, so it is generated once and cached).
+    """
+    lines = ["def succ(s):",
+             "    p0, p1, p2, h0, h1, h2 = s",
+             "    out = []"]
+    for i, j in _MOVES:
+        # Top disk of i goes onto j if j is empty or has a bigger top
+        p = ['p0', 'p1', 'p2']
+        h = ['h0', 'h1', 'h2']
+        p[i] = f"p{i} >> 4"
+        p[j] = f"(p{j} << 4) | (p{i} & 15)"
+        h[i] = f"h{i} - 1"
+        h[j] = f"h{j} + 1"
+        lines.append(f"    if h{i} and (not h{j} or (p{j} & 15) > (p{i} & 15)):")
+        lines.append(f"        out.append(({', '.join(p + h)}))")
+    lines.append("    return out")
+    
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace['succ']
+
+
 class HanoiState:
     """
     Represents a state in the Tower of Hanoi puzzle.
     
     A state consists of the configuration of disks on three pegs.
-    Each peg is represented as a tuple of disk numbers (from top to bottom).
-    Disk 1 is the smallest, disk n is the largest.
+    Each peg is packed into a single int holding one 4-bit disk number
+    per nibble, with the top of the peg in the lowest nibble.
+    The whole state is the tuple s = (p0, p1, p2, h0, h1, h2) of packed
+    pegs followed by peg heights, so hashing and equality are cheap.
+    Disk 1 is the smallest, disk n is the largest (n <= 15).
     """
     
+    # No per-instance __dict__: BFS keeps up to 3^n states alive.
+    # parent is set by BFS(intrusive_parent=True) to the discovering state
+    __slots__ = ('s', '_hash', 'parent')
+    
     def __init__(self, pegs: Tuple[Tuple[int, ...], Tuple[int, ...], Tuple[int, ...]]):
         """
         Initialize a Hanoi state.
         
         Args:
             pegs: Tuple of 3 tuples, each representing a peg with disks
-                 Example: ((1, 2, 3), (), ()) means all disks on peg 0
+                 from bottom to top (the top disk is the last element)
+                 Example: ((3, 2, 1), (), ()) means all disks on peg 0
         """
-        self.pegs = pegs
+        packed = []
+        for peg in pegs:
+            # Pushing disks bottom to top leaves the top disk in the low nibble
+            p = 0
+            for disk in peg:
+                p = (p << 4) | disk
+            packed.append(p)
+        self.s = (packed[0], packed[1], packed[2],
+                  len(pegs[0]), len(pegs[1]), len(pegs[2]))
+        self._hash = hash(self.s)
+        self.parent = None
+    
+    @classmethod
+    def from_state_id(cls, state_id: int, n_disks: int) -> 'HanoiState':
+        """Build a state from its dense base-3 id (inverse of state_id)"""
+        pegs = ([], [], [])
+        # Push disks largest first so each peg ends up bottom to top
+        for disk in range(n_disks, 0, -1):
+            pegs[(state_id // _POW3[disk - 1]) % 3].append(disk)
+        return cls(tuple(tuple(peg) for peg in pegs))
+    
+    @classmethod
+    def from_packed(cls, s: Tuple[int, int, int, int, int, int]) -> 'HanoiState':
+        """Build a state directly from its packed (p0, p1, p2, h0, h1, h2) tuple"""
+        state = cls.__new__(cls)
+        state.s = s
+        state._hash = hash(s)
+        state.parent = None
+        return state
+    
+    @property
+    def pegs(self) -> Tuple[Tuple[int, ...], Tuple[int, ...], Tuple[int, ...]]:
+        """Decode the packed pegs back to tuples of disks (from bottom to top)"""
+        s = self.s
+        return tuple(
+            tuple((s[k] >> (4 * i)) & 0xF for i in range(s[k + 3] - 1, -1, -1))
+            for k in range(3)
+        )
     
     def __eq__(self, other):
-        """Check equality based on peg configuration"""
+        """Check equality based on packed configuration"""
         if not isinstance(other, HanoiState):
             return False
-        return self.pegs == other.pegs
+        return self.s == other.s
     
     def __hash__(self):
-        """Hash based on peg configuration for use in sets/dicts"""
-        return hash(self.pegs)
+        """Hash based on packed configuration, computed once at creation"""
+        return self._hash
     
     def __repr__(self):
         """String representation for debugging"""
         return f"HanoiState({self.pegs})"
     
+    def state_id(self) -> int:
+        """
+        Dense integer id of this state in [0, 3^n).
+        
+        Disk d contributes peg_of(d) * 3^(d-1), which is a bijection
+        between configurations and base-3 numbers of n digits.
+        """
+        s = self.s
+        state_id = 0
+        for peg in (1, 2):
+            p = s[peg]
+            while p:
+                state_id += peg * _POW3[(p & 0xF) - 1]
+                p >>= 4
+        return state_id
+    
     def to_string(self):
         """Pretty string representation"""
-        return f"[{self.pegs[0]}|{self.pegs[1]}|{self.pegs[2]}]"
+        pegs = self.pegs
+        return f"[{pegs[0]}|{pegs[1]}|{pegs[2]}]"
     
     def is_valid_move(self, from_peg: int, to_peg: int) -> bool:
         """
@@ -72,17 +168,12 @@ class HanoiState:
         if from_peg == to_peg:
             return False
         
-        # Source peg must have at least one disk
-        if not self.pegs[from_peg]:
-            return False
-        
-        # If destination peg has disks, check size constraint
-        if self.pegs[to_peg]:
-            # Can only place smaller disk on larger disk
-            if self.pegs[from_peg][0] > self.pegs[to_peg][0]:
-                return False
+        s = self.s
         
-        return True
+        # Source peg must have at least one disk, and can only place
+        # a smaller disk on a larger one (top disks are the low nibbles)
+        return s[from_peg + 3] > 0 and (
+            s[to_peg + 3] == 0 or (s[to_peg] & 0xF) > (s[from_peg] & 0xF))
     
     def make_move(self, from_peg: int, to_peg: int) -> 'HanoiState':
         """
@@ -95,15 +186,16 @@ class HanoiState:
         Returns:
             New HanoiState after the move
         """
-        # Create mutable copy of pegs
-        new_pegs = [list(peg) for peg in self.pegs]
+        p = list(self.s)
         
-        # Move top disk from source to destination
-        disk = new_pegs[from_peg].pop(0)
-        new_pegs[to_peg].insert(0, disk)
+        # Move top nibble from source to destination
+        disk = p[from_peg] & 0xF
+        p[from_peg] >>= 4
+        p[to_peg] = (p[to_peg] << 4) | disk
+        p[from_peg + 3] -= 1
+        p[to_peg + 3] += 1
         
-        # Return new immutable state
-        return HanoiState(tuple(tuple(peg) for peg in new_pegs))
+        return HanoiState.from_packed(tuple(p))
     
     def get_successors(self) -> List['HanoiState']:
         """
@@ -112,15 +204,31 @@ class HanoiState:
         Returns:
             List of HanoiState objects reachable in one move
         """
-        successors = []
-        
         # Try all possible moves (from each peg to each other peg)
-        for from_peg in range(3):
-            for to_peg in range(3):
-                if self.is_valid_move(from_peg, to_peg):
-                    successors.append(self.make_move(from_peg, to_peg))
+        return [successor for from_peg, to_peg in _MOVES
+                if (successor := self._try_move(from_peg, to_peg)) is not None]
+    
+    def _try_move(self, from_peg: int, to_peg: int):
+        """
+        Check and perform a move in one pass (is_valid_move + make_move).
         
-        return successors
+        Peg indices are assumed valid and distinct (see _MOVES).
+        
+        Returns:
+            New HanoiState after the move, or None if the move is invalid
+        """
+        s = self.s
+        top = s[from_peg] & 0xF
+        if not s[from_peg + 3] or (s[to_peg + 3] and (s[to_peg] & 0xF) < top):
+            return None
+        
+        p = list(s)
+        p[from_peg] >>= 4
+        p[to_peg] = (p[to_peg] << 4) | top
+        p[from_peg + 3] -= 1
+        p[to_peg + 3] += 1
+        
+        return HanoiState.from_packed(tuple(p))
     
     def is_goal(self, goal_peg: int = 2) -> bool:
         """
@@ -134,8 +242,8 @@ class HanoiState:
         Returns:
             True if this is a goal state
         """
-        return (not self.pegs[(goal_peg + 1) % 3] and 
-                not self.pegs[(goal_peg + 2) % 3])
+        return (not self.s[(goal_peg + 1) % 3 + 3] and 
+                not self.s[(goal_peg + 2) % 3 + 3])
 
 
 class HanoiGame:
@@ -146,30 +254,60 @@ class HanoiGame:
     and find the optimal solution.
     """
     
-    def __init__(self, n_disks: int, start_peg: int = 0, goal_peg: int = 2):
+    def __init__(self, n_disks: int, start_peg: int = 0, goal_peg: int = 2,
+                 bfs: BFS = None):
         """
         Initialize a Hanoi game instance.
         
         Args:
-            n_disks: Number of disks (1 or more)
+            n_disks: Number of disks (1 to 15, one 4-bit nibble per disk)
             start_peg: Peg where all disks start (0, 1, or 2)
             goal_peg: Target peg where disks should end (0, 1, or 2)
+            bfs: Optional BFS instance to reuse across games (reset by solve),
+                 preferably created with intrusive_parent=True
         """
+        if not 1 <= n_disks <= 15:
+            raise ValueError("n_disks must be between 1 and 15")
+        
         self.n_disks = n_disks
         self.start_peg = start_peg
         self.goal_peg = goal_peg
         
-        # Create initial state: all disks on start_peg
+        # Create initial state: all disks on start_peg (largest at the bottom)
         pegs = [(), (), ()]
-        pegs[start_peg] = tuple(range(1, n_disks + 1))
+        pegs[start_peg] = tuple(range(n_disks, 0, -1))
         self.initial_state = HanoiState(tuple(pegs))
         
-        self.bfs = BFS()
+        # Goal state: all disks on goal_peg
+        pegs = [(), (), ()]
+        pegs[goal_peg] = tuple(range(n_disks, 0, -1))
+        self.goal_state = HanoiState(tuple(pegs))
+        
+        # Indices in HanoiState.s of the heights of the two non-goal pegs,
+        # used by the goal predicate (same test as HanoiState.is_goal)
+        self._other_heights = ((goal_peg + 1) % 3 + 3, (goal_peg + 2) % 3 + 3)
+        
+        self.bfs = bfs if bfs is not None else BFS(intrusive_parent=True)
     
-    def solve(self):
+    def solve(self, explore_all: bool = False, engine: str = 'python',
+              with_path: bool = True):
         """
         Solve the Hanoi puzzle using BFS.
         
+        By default the search stops as soon as the goal state is reached.
+        
+        Args:
+            explore_all: If True, explore the whole 3^n state space instead
+                        of stopping at the goal state
+            engine: 'python' (BFS class), 'compiled' (BFS class over packed
+                   tuples with a generated successor function), 'numba'
+                   (compiled kernel from hanoi_numba, requires numpy and
+                   numba) or 'bidirectional' (search from both ends,
+                   explore_all is ignored)
+            with_path: If False, the 'python' and 'compiled' engines only
+                      report the number of moves (the length of the BFS
+                      parent chain of the goal) and return an empty path
+        
         Returns:
             Dictionary with:
             - total_states: Number of states explored
@@ -178,26 +316,40 @@ class HanoiGame:
             - theoretical_minimum: Theoretical minimum (2^n - 1)
             - path: List of states in the solution
         """
+        if engine == 'compiled':
+            return self._solve_compiled(explore_all, with_path)
+        if engine == 'numba':
+            return self._solve_numba(explore_all)
+        if engine == 'bidirectional':
+            return self._solve_bidirectional()
+        if engine != 'python':
+            raise ValueError(f"Unknown engine: {engine}")
+        
+        a, b = self._other_heights
+        
+        # Start from a clean BFS, keeping its buffers when sizes match
+        self.bfs.reset(3 ** self.n_disks)
+        
         # Explore state space using BFS
         stats = self.bfs.explore(
             self.initial_state,
-            lambda state: state.get_successors()
+            lambda state: state.get_successors(),
+            state_id_func=HanoiState.state_id,
+            n_states=3 ** self.n_disks,
+            is_goal=lambda state: not state.s[a] and not state.s[b],
+            stop_at_goal=not explore_all
         )
         
-        # Find a goal state
-        goal_state = None
-        for state in self.bfs.visited:
-            if state.is_goal(self.goal_peg):
-                goal_state = state
-                break
-        
-        # Get solution path
-        if goal_state:
-            path = self.bfs.get_path(self.initial_state, goal_state)
-            solution_length = len(path) - 1  # Number of moves
+        # Number of moves is the BFS depth of the goal state (its parent chain)
+        goal = self.bfs.goal
+        solution_length = self.bfs.distance(goal) if goal is not None else -1
+        
+        # Get solution path (from the discovered goal instance, which
+        # carries the parent pointers)
+        if with_path and solution_length >= 0:
+            path = self.bfs.get_path(self.initial_state, goal)
         else:
             path = []
-            solution_length = -1
         
         return {
             'total_states': stats['total_states'],
@@ -207,6 +359,132 @@ class HanoiGame:
             'path': path
         }
     
+    @staticmethod
+    def _compile_succ():
+        """
+        Generate the successor function over packed state tuples.
+        
+        The 6 moves are unrolled with their peg indices inlined, so a call
+        only does local variable arithmetic: no HanoiState objects, no
+        tuple indexing by move.
+        
+        Returns:
+            Function mapping s = (p0, p1, p2, h0, h1, h2) to the list of
+            packed successor tuples
+        """
+        return _build_compiled_succ()
+    
+    def _solve_compiled(self, explore_all: bool, with_path: bool):
+        """Same as solve(), exploring packed tuples with _compile_succ()"""
+        a, b = self._other_heights
+        
+        # Tuples cannot hold intrusive parent pointers: use a dict-based BFS
+        bfs = BFS()
+        stats = bfs.explore(
+            self.initial_state.s,
+            self._compile_succ(),
+            is_goal=lambda s: not s[a] and not s[b],
+            stop_at_goal=not explore_all
+        )
+        
+        goal = bfs.goal
+        solution_length = bfs.distance(goal) if goal is not None else -1
+        
+        if with_path and solution_length >= 0:
+            path = [HanoiState.from_packed(s)
+                    for s in bfs.get_path(self.initial_state.s, goal)]
+        else:
+            path = []
+        
+        return {
+            'total_states': stats['total_states'],
+            'total_transitions': stats['total_transitions'],
+            'solution_length': solution_length,
+            'theoretical_minimum': 2**self.n_disks - 1,
+            'path': path
+        }
+    
+    def _solve_numba(self, explore_all: bool):
+        """Same as solve(), with the search done by the compiled kernel"""
+        from hanoi_numba import solve_ids
+        
+        path_ids, total_states, total_transitions = solve_ids(
+            self.n_disks, self.start_peg, self.goal_peg, explore_all)
+        path = [HanoiState.from_state_id(i, self.n_disks) for i in path_ids]
+        
+        return {
+            'total_states': total_states,
+            'total_transitions': total_transitions,
+            'solution_length': len(path) - 1 if path else -1,
+            'theoretical_minimum': 2**self.n_disks - 1,
+            'path': path
+        }
+    
+    def _solve_bidirectional(self):
+        """
+        Same as solve(), searching from the initial and goal states at once.
+        
+        Every Hanoi move is reversible, so get_successors also gives the
+        predecessors for the backward search. Whole levels are expanded on
+        the side with the smaller frontier; the first state reached by both
+        searches lies on a shortest path.
+        """
+        start, goal = self.initial_state, self.goal_state
+        
+        # parent pointers: towards start (forward), towards goal (backward)
+        fwd_parent = {start: None}
+        bwd_parent = {goal: None}
+        fwd_frontier = [start]
+        bwd_frontier = [goal]
+        total_transitions = 0
+        meet = start if start == goal else None
+        
+        while meet is None and fwd_frontier and bwd_frontier:
+            if len(fwd_frontier) <= len(bwd_frontier):
+                frontier, parent, other = fwd_frontier, fwd_parent, bwd_parent
+            else:
+                frontier, parent, other = bwd_frontier, bwd_parent, fwd_parent
+            
+            next_frontier = []
+            for current in frontier:
+                successors = current.get_successors()
+                total_transitions += len(successors)
+                for successor in successors:
+                    if successor not in parent:
+                        parent[successor] = current
+                        if successor in other:
+                            meet = successor
+                            break
+                        next_frontier.append(successor)
+                if meet is not None:
+                    break
+            
+            if frontier is fwd_frontier:
+                fwd_frontier = next_frontier
+            else:
+                bwd_frontier = next_frontier
+        
+        path = []
+        if meet is not None:
+            # start .. meet from the forward tree, then meet .. goal backward
+            current = meet
+            while current is not None:
+                path.append(current)
+                current = fwd_parent[current]
+            path.reverse()
+            current = bwd_parent[meet]
+            while current is not None:
+                path.append(current)
+                current = bwd_parent[current]
+        
+        return {
+            'total_states': len(fwd_parent) + len(bwd_parent) - (meet is not None),
+            'total_transitions': total_transitions,
+            'solution_length': len(path) - 1 if path else -1,
+            'theoretical_minimum': 2**self.n_disks - 1,
+            'path': path
+        }
+    
     def print_solution(self, result):
         """Print the solution in a formatted way"""
         print(f"\n{'='*70}")
@@ -235,6 +513,72 @@ class HanoiGame:
             print(f"  ... ({len(result['path']) - 8} more steps)")
 
 
+class HanoiSolver:
+    """
+    Solution lengths of many Hanoi games from a single BFS.
+    
+    precompute(n) explores the n-disk state space once from the state with
+    every disk on peg 0 and keeps the distance of each state id. Any game
+    with up to n disks and any (start_peg, goal_peg) pair is then a lookup:
+    - pegs are symmetric, so they are relabeled to make start_peg peg 0
+    - a k-disk game is the n-disk space with the n-k largest disks left
+      on the start peg (they never have to move)
+    """
+    
+    def __init__(self):
+        """Create an empty solver (call precompute before solve)"""
+        self.n_disks = 0
+        self.distances: List[int] = []
+    
+    def precompute(self, n_disks: int):
+        """
+        Fill self.distances (indexed by HanoiState.state_id) for n_disks.
+        
+        Args:
+            n_disks: Number of disks (1 to 15)
+        """
+        if not 1 <= n_disks <= 15:
+            raise ValueError("n_disks must be between 1 and 15")
+        
+        n_states = 3 ** n_disks
+        # Depths recorded by BFS in an array indexed by state id: the table
+        bfs = BFS(intrusive_parent=True, track_depth=True)
+        bfs.explore(
+            HanoiState((tuple(range(n_disks, 0, -1)), (), ())),
+            lambda state: state.get_successors(),
+            state_id_func=HanoiState.state_id,
+            n_states=n_states
+        )
+        
+        distances = bfs.depth_ids.tolist()
+        
+        self.n_disks = n_disks
+        self.distances = distances
+    
+    def solve(self, start_peg: int = 0, goal_peg: int = 2, n_disks: int = None) -> int:
+        """
+        Number of moves of the optimal solution, read from the distance table.
+        
+        Args:
+            start_peg: Peg where all disks start (0, 1, or 2)
+            goal_peg: Target peg where disks should end (0, 1, or 2)
+            n_disks: Number of disks, at most the precomputed one
+                    (default: the precomputed one)
+        
+        Returns:
+            Solution length in moves
+        """
+        if n_disks is None:
+            n_disks = self.n_disks
+        if not 1 <= n_disks <= self.n_disks:
+            raise ValueError(f"n_disks must be between 1 and {self.n_disks} (precomputed)")
+        
+        # Rotate peg labels so that start_peg becomes peg 0; the n_disks
+        # smallest disks go to the rotated goal peg, the others stay on 0
+        goal = (goal_peg - start_peg) % 3
+        return self.distances[goal * (_POW3[n_disks] - 1) // 2]
+
+
 # =============================================================================
 # TESTS TO VERIFY HANOI IMPLEMENTATION
 # =============================================================================
@@ -246,7 +590,7 @@ def test_hanoi_2_disks():
     print("="*70)
     
     game = HanoiGame(n_disks=2)
-    result = game.solve()
+    result = game.solve(explore_all=True)
     
     print(f"\nStates explored: {result['total_states']}")
     print(f"Solution: {result['solution_length']} moves")
@@ -267,7 +611,7 @@ def test_hanoi_3_disks():
     print("="*70)
     
     game = HanoiGame(n_disks=3)
-    result = game.solve()
+    result = game.solve(explore_all=True)
     game.print_solution(result)
     
     assert result['solution_length'] == 7, "3 disks should take 7 moves"
@@ -284,7 +628,7 @@ def test_hanoi_4_disks():
     print("="*70)
     
     game = HanoiGame(n_disks=4)
-    result = game.solve()
+    result = game.solve(explore_all=True)
     
     print(f"\nStates explored: {result['total_states']}")
     print(f"Solution: {result['solution_length']} moves")
@@ -308,9 +652,10 @@ def test_hanoi_state_growth():
     print("|"+ "-"*68 + "|")
     
     all_correct = True
+    bfs = BFS(intrusive_parent=True)  # Shared across games, reset by each solve()
     for n in range(2, 6):
-        game = HanoiGame(n_disks=n)
-        result = game.solve()
+        game = HanoiGame(n_disks=n, bfs=bfs)
+        result = game.solve(explore_all=True, with_path=False)
         
         expected_states = 3**n
         expected_moves = 2**n - 1
@@ -331,6 +676,132 @@ def test_hanoi_state_growth():
     return True
 
 
+def test_hanoi_goal_early_stop():
+    """Test 5: Search stops as soon as the goal state is reached"""
+    print("="*70)
+    print("TEST 5: Early Stop at Goal State")
+    print("="*70)
+    
+    print("\n| Disks | States explored | Full space (3^n) | Moves |")
+    print("|"+ "-"*54 + "|")
+    
+    for n in range(2, 6):
+        game = HanoiGame(n_disks=n)
+        result = game.solve()
+        
+        print(f"| {n:5} | {result['total_states']:15} | {3**n:16} | "
+              f"{result['solution_length']:5} |")
+        
+        assert result['solution_length'] == 2**n - 1, "Early stop must keep optimal length"
+        assert result['total_states'] < 3**n, "Early stop should not explore every state"
+        assert result['path'][-1] == game.goal_state, "Path should end at the goal state"
+    
+    print("\n✓ Test passed!\n")
+    return True
+
+
+def test_hanoi_bidirectional():
+    """Test 6: Bidirectional search finds the same optimal solution"""
+    print("="*70)
+    print("TEST 6: Bidirectional Search")
+    print("="*70)
+    
+    print("\n| Disks | States (forward) | States (bidirectional) | Moves |")
+    print("|"+ "-"*60 + "|")
+    
+    for n in range(2, 8):
+        forward = HanoiGame(n_disks=n).solve()
+        result = HanoiGame(n_disks=n).solve(engine='bidirectional')
+        
+        print(f"| {n:5} | {forward['total_states']:16} | "
+              f"{result['total_states']:22} | {result['solution_length']:5} |")
+        
+        assert result['solution_length'] == 2**n - 1, "Bidirectional search must stay optimal"
+        assert result['path'] == forward['path'], "Optimal Hanoi solution is unique"
+    
+    print("\n✓ Test passed!\n")
+    return True
+
+
+def test_hanoi_compiled():
+    """Test 7: Generated successor function matches HanoiState.get_successors"""
+    print("="*70)
+    print("TEST 7: Compiled Successor Function")
+    print("="*70)
+    
+    for n in range(2, 7):
+        for explore_all in (True, False):
+            expected = HanoiGame(n_disks=n).solve(explore_all=explore_all)
+            result = HanoiGame(n_disks=n).solve(explore_all=explore_all,
+                                                engine='compiled')
+            for key in ('total_states', 'total_transitions',
+                        'solution_length', 'path'):
+                assert result[key] == expected[key], f"{key} differs for n={n}"
+        print(f"n={n}: {result['total_states']} states, "
+              f"{result['solution_length']} moves")
+    
+    print("\n✓ Test passed!\n")
+    return True
+
+
+def test_hanoi_numba():
+    """Test 8: Numba kernel matches the python engine (skipped without numba)"""
+    print("="*70)
+    print("TEST 8: Numba Engine")
+    print("="*70)
+    
+    try:
+        __import__("numba")
+    except ImportError:
+        print("\nnumba not installed: skipped\n")
+        return True
+    
+    for n in range(1, 7):
+        for start_peg, goal_peg in ((0, 2), (1, 0), (2, 1)):
+            for explore_all in (True, False):
+                expected = HanoiGame(n, start_peg, goal_peg).solve(explore_all=explore_all)
+                result = HanoiGame(n, start_peg, goal_peg).solve(explore_all=explore_all,
+                                                                 engine='numba')
+                for key in ('total_states', 'total_transitions',
+                            'solution_length', 'path'):
+                    assert result[key] == expected[key], \
+                        f"{key} differs for n={n}, pegs {start_peg}->{goal_peg}"
+        print(f"n={n}: {result['total_states']} states, "
+              f"{result['solution_length']} moves")
+    
+    print("\n✓ Test passed!\n")
+    return True
+
+
+def test_hanoi_precomputed():
+    """Test 9: One BFS answers every smaller game and every peg pair"""
+    print("="*70)
+    print("TEST 9: Precomputed Distances (HanoiSolver)")
+    print("="*70)
+    
+    solver = HanoiSolver()
+    solver.precompute(5)
+    print(f"\nOne BFS over {len(solver.distances)} states (5 disks)")
+    
+    for n in range(1, 6):
+        for start_peg in range(3):
+            for goal_peg in range(3):
+                expected = 0 if start_peg == goal_peg else 2**n - 1
+                moves = solver.solve(start_peg, goal_peg, n_disks=n)
+                assert moves == expected, \
+                    f"{n} disks {start_peg}->{goal_peg}: {moves} moves, expected {expected}"
+        print(f"n={n}: {2**n - 1} moves for every pair of distinct pegs")
+    
+    # Cross-check against independent searches
+    for n, start_peg, goal_peg in ((3, 1, 0), (4, 2, 1)):
+        game = HanoiGame(n_disks=n, start_peg=start_peg, goal_peg=goal_peg)
+        assert solver.solve(start_peg, goal_peg, n_disks=n) == \
+            game.solve(with_path=False)['solution_length']
+    
+    print("\n✓ Test passed!\n")
+    return True
+
+
 def run_all_tests():
     """Run all Hanoi tests"""
     print("\n" + "#"*70)
@@ -342,7 +813,12 @@ def run_all_tests():
         ("2 Disks", test_hanoi_2_disks),
         ("3 Disks", test_hanoi_3_disks),
         ("4 Disks", test_hanoi_4_disks),
-        ("State Growth", test_hanoi_state_growth)
+        ("State Growth", test_hanoi_state_growth),
+        ("Early Stop", test_hanoi_goal_early_stop),
+        ("Bidirectional", test_hanoi_bidirectional),
+        ("Compiled Successors", test_hanoi_compiled),
+        ("Numba Engine", test_hanoi_numba),
+        ("Precomputed Distances", test_hanoi_precomputed)
     ]
     
     results = []
@@ -0,0 +1,142 @@
+"""
+Numba-compiled BFS for the Tower of Hanoi.
+
+States are dense integer ids in [0, 3^n): disk d (0 = smallest) sits on
+peg (id // 3^d) % 3. The whole search (queue, visited marker, parent
+pointers, successor generation) runs on integer arrays inside one
+@njit kernel, so the interpreter is only involved once per solve.
+
+Requires numpy and numba; used by HanoiGame.solve(engine='numba').
+"""
+
+import numpy as np
+from numba import njit
+
+
+# The 6 (from_peg, to_peg) moves between two distinct pegs
+_MOVES = np.array([[0, 1], [0, 2], [1, 0], [1, 2], [2, 0], [2, 1]], dtype=np.int64)
+
+
+def peg_state_id(n_disks, peg):
+    """Id of the state with all n_disks on the given peg"""
+    return peg * (3 ** n_disks - 1) // 2
+
+
+@njit(cache=True)
+def bfs_hanoi(n, start_id, goal_id, explore_all, moves):
+    """
+    BFS over the 3^n Hanoi states starting from start_id.
+
+    Args:
+        n: Number of disks
+        start_id: Id of the initial state
+        goal_id: Id of the goal state
+        explore_all: If False, stop as soon as goal_id is discovered
+        moves: (6, 2) array of (from_peg, to_peg) pairs
+
+    Returns:
+        (parent, total_states, total_transitions) where parent[i] is the
+        id of the state that discovered i (-1 for the root and for
+        unvisited states)
+    """
+    n_states = 1
+    for _ in range(n):
+        n_states *= 3
+
+    pow3 = np.empty(n, dtype=np.int64)
+    p = 1
+    for d in range(n):
+        pow3[d] = p
+        p *= 3
+
+    visited = np.zeros(n_states, dtype=np.uint8)
+    parent = np.full(n_states, -1, dtype=np.int32)
+    # Every state is enqueued at most once, so head/tail never wrap
+    queue = np.empty(n_states, dtype=np.int64)
+    top = np.empty(3, dtype=np.int64)
+
+    visited[start_id] = 1
+    queue[0] = start_id
+    head = 0
+    tail = 1
+    total_states = 1
+    total_transitions = 0
+
+    if not explore_all and start_id == goal_id:
+        return parent, total_states, total_transitions
+
+    while head < tail:
+        current = queue[head]
+        head += 1
+
+        # Top disk of each peg = smallest disk on it (n when empty)
+        top[0] = n
+        top[1] = n
+        top[2] = n
+        rest = current
+        for d in range(n):
+            peg = rest % 3
+            rest //= 3
+            if top[peg] == n:
+                top[peg] = d
+
+        found = False
+        for k in range(6):
+            i = moves[k, 0]
+            j = moves[k, 1]
+            if top[i] < top[j]:
+                # Count every move of current, like BFS.explore does
+                total_transitions += 1
+                if found:
+                    continue
+                successor = current + (j - i) * pow3[top[i]]
+                if visited[successor] == 0:
+                    visited[successor] = 1
+                    parent[successor] = current
+                    total_states += 1
+                    if not explore_all and successor == goal_id:
+                        found = True
+                        continue
+                    queue[tail] = successor
+                    tail += 1
+
+        if found:
+            break
+
+    return parent, total_states, total_transitions
+
+
+def solve_ids(n_disks, start_peg, goal_peg, explore_all=False):
+    """
+    Run the compiled BFS and return the solution as a list of state ids.
+
+    Returns:
+        (path_ids, total_states, total_transitions), path_ids is empty
+        if the goal was not reached
+    """
+    start_id = peg_state_id(n_disks, start_peg)
+    goal_id = peg_state_id(n_disks, goal_peg)
+    parent, total_states, total_transitions = bfs_hanoi(
+        n_disks, start_id, goal_id, explore_all, _MOVES)
+
+    path_ids = []
+    if goal_id == start_id or parent[goal_id] != -1:
+        current = goal_id
+        while current != start_id:
+            path_ids.append(current)
+            current = int(parent[current])
+        path_ids.append(start_id)
+        path_ids.reverse()
+
+    return path_ids, int(total_states), int(total_transitions)
+
+
+if __name__ == "__main__":
+    import time
+
+    for n in range(2, 14):
+        t0 = time.perf_counter()
+        path_ids, states, transitions = solve_ids(n, 0, 2, explore_all=True)
+        elapsed = time.perf_counter() - t0
+        print(f"n={n:2}: {states:8} states, {transitions:8} transitions, "
+              f"{len(path_ids) - 1:5} moves ({elapsed*1000:.1f} ms)")
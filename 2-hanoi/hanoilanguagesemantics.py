@@ -4,25 +4,30 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "common"))
 
 from languagesemantics import LanguageSemantics
-from copy import deepcopy
 
 # Classe State pour représenter un état de Hanoi
 # Utilise des listes mutables pour meilleures performances
 class HanoiState:
+    # Pas de __dict__ par instance : le BFS garde tous les états en mémoire
+    __slots__ = ('pegs', '_key', '_hash')
+
     def __init__(self, pegs):
         # pegs est une liste de listes: [[3,2,1], [], []]
         self.pegs = pegs
+        # Clé immuable calculée une seule fois (un état n'est plus modifié
+        # après sa création), utilisée par __eq__ et __hash__
+        self._key = (tuple(pegs[0]), tuple(pegs[1]), tuple(pegs[2]))
+        self._hash = hash(self._key)
 
     # Méthode pour comparer deux états (nécessaire pour BFS)
     def __eq__(self, other):
         if not isinstance(other, HanoiState):
             return False
-        return self.pegs == other.pegs
+        return self._key == other._key
 
     # Méthode pour rendre l'état hashable (utilisable dans des sets/dicts)
     def __hash__(self):
-        # Convertir en tuple pour le rendre hashable
-        return hash(tuple(tuple(peg) for peg in self.pegs))
+        return self._hash
 
     # Représentation lisible de l'état
     def __repr__(self):
@@ -37,6 +42,10 @@ class HanoiLanguageSemantics(LanguageSemantics):
     # Constructeur : initialise le problème avec n disques
     def __init__(self, n_disks):
         self.n = n_disks
+        # États solutions (tous les disques sur la tige 2 ou 1), construits
+        # une seule fois au lieu d'être recréés à chaque appel de is_solution
+        self._goal1 = [[], [], list(range(self.n, 0, -1))]
+        self._goal2 = [[], list(range(self.n, 0, -1)), []]
 
     # Retourne les états initiaux : tous les disques sur la première tige
     def initials(self):
@@ -79,8 +88,9 @@ class HanoiLanguageSemantics(LanguageSemantics):
     def execute(self, state, action):
         source, dest = action
 
-        # Deepcopy de l'état complet en une seule opération
-        new_pegs = deepcopy(state.pegs)
+        # Copie superficielle suffisante : les disques sont des entiers immuables
+        pegs = state.pegs
+        new_pegs = [pegs[0][:], pegs[1][:], pegs[2][:]]
 
         # Déplace le disque
         disk = new_pegs[source].pop()
@@ -92,5 +102,4 @@ class HanoiLanguageSemantics(LanguageSemantics):
 
     # Méthode utilitaire pour vérifier si un état est une solution
     def is_solution(self, state):
-        return (state.pegs == [[], [], list(range(self.n, 0, -1))] or
-                state.pegs == [[], list(range(self.n, 0, -1)), []])
+        return state.pegs == self._goal1 or state.pegs == self._goal2
@@ -10,7 +10,6 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "1-bfs"))
 
 from hanoilanguagesemantics import HanoiLanguageSemantics
 from ls2rg import LS2RG
-from bfs import BFS
 from collections import deque
 
 
@@ -65,10 +64,11 @@ def hanoi_solver_ls(n):
     # Étape 3: Définir le callback pour trouver la solution
     def on_entry(state, opaque):
         # Si on trouve une solution, on l'ajoute à opaque
-        if ls.is_solution(state):
+        sol = ls.is_solution(state)
+        if sol:
             opaque.append(state)
         # Arrête le parcours dès qu'une solution est trouvée
-        return ls.is_solution(state)
+        return sol
 
     # Étape 4: Lancer BFS sur le graphe enraciné
     return breadth_first_search_rg(rg, on_entry, [])
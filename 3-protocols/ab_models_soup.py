@@ -8,18 +8,32 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "common"))
 
 from souplanguagesemantics import Piece, Soup, SoupLanguageSemantics
+from ab_state import (
+    LOC_A_MASK, LOC_B_MASK, FA_MASK, FB_MASK, TURN_MASK,
+    A_I, A_W, A_CS, B_I, B_W, B_CS, B_R, FA_UP, FB_UP, TURN_BOB,
+    KEY_DOMAIN, unpack,
+)
 
 
 # =============================================================================
 # State representation
 # =============================================================================
-# State is a tuple for hashability:
+# State is a packed int (see ab_state) holding the components:
 #   AB1: (alice_loc, bob_loc)
 #   AB2-AB4: (alice_loc, bob_loc, flagAlice, flagBob)
 #   AB5: (alice_loc, bob_loc, flagAlice, flagBob, turn)
 #
-# Locations: "I" (Idle), "W" (Waiting), "CS" (Critical Section),
-#            "R" (Retreat, AB4 only)
+# Locations: I (Idle), W (Waiting), CS (Critical Section),
+#            R (Retreat, AB4 only)
+# The initial state of every model (all I, flags DOWN, turn Alice) is 0.
+#
+# The domain covers all 128 packed values, so SoupLanguageSemantics
+# evaluates each guard once per value and then answers actions() with
+# a single table lookup.
+STATE_DOMAIN = range(KEY_DOMAIN)
+
+# Number of components of each model, for printing with unpack_state
+MODEL_FIELDS = {"AB1": 2, "AB2": 4, "AB3": 4, "AB4": 4, "AB5": 5}
 
 
 # =============================================================================
@@ -32,20 +46,36 @@ def make_ab1():
     pieces = [
         # Alice transitions
         Piece("a1",
-              lambda s: ("CS", s[1]),
-              lambda s: s[0] == "I"),
+              lambda s: (s & ~LOC_A_MASK) | A_CS,
+              lambda s: (s & LOC_A_MASK) == A_I),
         Piece("a2",
-              lambda s: ("I", s[1]),
-              lambda s: s[0] == "CS"),
+              lambda s: (s & ~LOC_A_MASK) | A_I,
+              lambda s: (s & LOC_A_MASK) == A_CS),
         # Bob transitions
         Piece("b1",
-              lambda s: (s[0], "CS"),
-              lambda s: s[1] == "I"),
+              lambda s: (s & ~LOC_B_MASK) | B_CS,
+              lambda s: (s & LOC_B_MASK) == B_I),
         Piece("b2",
-              lambda s: (s[0], "I"),
-              lambda s: s[1] == "CS"),
+              lambda s: (s & ~LOC_B_MASK) | B_I,
+              lambda s: (s & LOC_B_MASK) == B_CS),
     ]
-    return Soup(pieces, ("I", "I"))
+    return Soup(pieces, 0, STATE_DOMAIN)
+
+
+# =============================================================================
+# Alice's flag protocol, shared by AB2, AB3 and AB4
+# =============================================================================
+# Built once at import: every model reuses the same Piece objects
+
+_ALICE_A1 = Piece("a1",
+                  lambda s: (s & ~(LOC_A_MASK | FA_MASK)) | A_W | FA_UP,
+                  lambda s: (s & LOC_A_MASK) == A_I)
+_ALICE_A2 = Piece("a2",
+                  lambda s: (s & ~LOC_A_MASK) | A_CS,
+                  lambda s: (s & LOC_A_MASK) == A_W and not (s & FB_MASK))
+_ALICE_A3 = Piece("a3",
+                  lambda s: (s & ~(LOC_A_MASK | FA_MASK)) | A_I,
+                  lambda s: (s & LOC_A_MASK) == A_CS)
 
 
 # =============================================================================
@@ -61,27 +91,19 @@ def make_ab1():
 def make_ab2():
     pieces = [
         # Alice transitions
-        Piece("a1",
-              lambda s: ("W", s[1], "UP", s[3]),
-              lambda s: s[0] == "I"),
-        Piece("a2",
-              lambda s: ("CS", s[1], s[2], s[3]),
-              lambda s: s[0] == "W" and s[3] == "DOWN"),
-        Piece("a3",
-              lambda s: ("I", s[1], "DOWN", s[3]),
-              lambda s: s[0] == "CS"),
+        _ALICE_A1, _ALICE_A2, _ALICE_A3,
         # Bob transitions
         Piece("b1",
-              lambda s: (s[0], "W", s[2], "UP"),
-              lambda s: s[1] == "I"),
+              lambda s: (s & ~(LOC_B_MASK | FB_MASK)) | B_W | FB_UP,
+              lambda s: (s & LOC_B_MASK) == B_I),
         Piece("b2",
-              lambda s: (s[0], "CS", s[2], s[3]),
-              lambda s: s[1] == "W" and s[2] == "DOWN"),
+              lambda s: (s & ~LOC_B_MASK) | B_CS,
+              lambda s: (s & LOC_B_MASK) == B_W and not (s & FA_MASK)),
         Piece("b3",
-              lambda s: (s[0], "I", s[2], "DOWN"),
-              lambda s: s[1] == "CS"),
+              lambda s: (s & ~(LOC_B_MASK | FB_MASK)) | B_I,
+              lambda s: (s & LOC_B_MASK) == B_CS),
     ]
-    return Soup(pieces, ("I", "I", "DOWN", "DOWN"))
+    return Soup(pieces, 0, STATE_DOMAIN)
 
 
 # =============================================================================
@@ -97,35 +119,27 @@ def make_ab2():
 def make_ab3():
     pieces = [
         # Alice transitions (same as AB2)
-        Piece("a1",
-              lambda s: ("W", s[1], "UP", s[3]),
-              lambda s: s[0] == "I"),
-        Piece("a2",
-              lambda s: ("CS", s[1], s[2], s[3]),
-              lambda s: s[0] == "W" and s[3] == "DOWN"),
-        Piece("a3",
-              lambda s: ("I", s[1], "DOWN", s[3]),
-              lambda s: s[0] == "CS"),
+        _ALICE_A1, _ALICE_A2, _ALICE_A3,
         # Bob transitions
         Piece("b1",
-              lambda s: (s[0], "W", s[2], "UP"),
-              lambda s: s[1] == "I"),
+              lambda s: (s & ~(LOC_B_MASK | FB_MASK)) | B_W | FB_UP,
+              lambda s: (s & LOC_B_MASK) == B_I),
         Piece("b2",
-              lambda s: (s[0], "CS", s[2], s[3]),
-              lambda s: s[1] == "W" and s[3] == "UP" and s[2] == "DOWN"),
+              lambda s: (s & ~LOC_B_MASK) | B_CS,
+              lambda s: (s & LOC_B_MASK) == B_W and s & FB_MASK and not (s & FA_MASK)),
         Piece("b3",
-              lambda s: (s[0], "I", s[2], "DOWN"),
-              lambda s: s[1] == "CS"),
+              lambda s: (s & ~(LOC_B_MASK | FB_MASK)) | B_I,
+              lambda s: (s & LOC_B_MASK) == B_CS),
         # Bob backs off: flag is UP and Alice's flag is UP -> lower flag
         Piece("b4",
-              lambda s: (s[0], s[1], s[2], "DOWN"),
-              lambda s: s[1] == "W" and s[3] == "UP" and s[2] == "UP"),
+              lambda s: s & ~FB_MASK,
+              lambda s: (s & LOC_B_MASK) == B_W and s & FB_MASK and s & FA_MASK),
         # Bob retries: flag is DOWN -> raise flag again
         Piece("b5",
-              lambda s: (s[0], s[1], s[2], "UP"),
-              lambda s: s[1] == "W" and s[3] == "DOWN"),
+              lambda s: s | FB_UP,
+              lambda s: (s & LOC_B_MASK) == B_W and not (s & FB_MASK)),
     ]
-    return Soup(pieces, ("I", "I", "DOWN", "DOWN"))
+    return Soup(pieces, 0, STATE_DOMAIN)
 
 
 # =============================================================================
@@ -141,35 +155,27 @@ def make_ab3():
 def make_ab4():
     pieces = [
         # Alice transitions (same as AB2)
-        Piece("a1",
-              lambda s: ("W", s[1], "UP", s[3]),
-              lambda s: s[0] == "I"),
-        Piece("a2",
-              lambda s: ("CS", s[1], s[2], s[3]),
-              lambda s: s[0] == "W" and s[3] == "DOWN"),
-        Piece("a3",
-              lambda s: ("I", s[1], "DOWN", s[3]),
-              lambda s: s[0] == "CS"),
+        _ALICE_A1, _ALICE_A2, _ALICE_A3,
         # Bob transitions
         Piece("b1",
-              lambda s: (s[0], "W", s[2], "UP"),
-              lambda s: s[1] == "I"),
+              lambda s: (s & ~(LOC_B_MASK | FB_MASK)) | B_W | FB_UP,
+              lambda s: (s & LOC_B_MASK) == B_I),
         Piece("b2",
-              lambda s: (s[0], "CS", s[2], s[3]),
-              lambda s: s[1] == "W" and s[3] == "UP" and s[2] == "DOWN"),
+              lambda s: (s & ~LOC_B_MASK) | B_CS,
+              lambda s: (s & LOC_B_MASK) == B_W and s & FB_MASK and not (s & FA_MASK)),
         Piece("b3",
-              lambda s: (s[0], "I", s[2], "DOWN"),
-              lambda s: s[1] == "CS"),
+              lambda s: (s & ~(LOC_B_MASK | FB_MASK)) | B_I,
+              lambda s: (s & LOC_B_MASK) == B_CS),
         # Bob retreats to R state, lowers flag
         Piece("b4",
-              lambda s: (s[0], "R", s[2], "DOWN"),
-              lambda s: s[1] == "W" and s[3] == "UP" and s[2] == "UP"),
+              lambda s: (s & ~(LOC_B_MASK | FB_MASK)) | B_R,
+              lambda s: (s & LOC_B_MASK) == B_W and s & FB_MASK and s & FA_MASK),
         # Bob retries from R: raises flag and goes to W
         Piece("b5",
-              lambda s: (s[0], "W", s[2], "UP"),
-              lambda s: s[1] == "R" and s[2] == "DOWN"),
+              lambda s: (s & ~LOC_B_MASK) | B_W | FB_UP,
+              lambda s: (s & LOC_B_MASK) == B_R and not (s & FA_MASK)),
     ]
-    return Soup(pieces, ("I", "I", "DOWN", "DOWN"))
+    return Soup(pieces, 0, STATE_DOMAIN)
 
 
 # =============================================================================
@@ -187,26 +193,26 @@ def make_ab5():
     pieces = [
         # Alice transitions
         Piece("a1",
-              lambda s: ("W", s[1], "UP", s[3], "Bob"),
-              lambda s: s[0] == "I"),
+              lambda s: (s & ~(LOC_A_MASK | FA_MASK)) | A_W | FA_UP | TURN_BOB,
+              lambda s: (s & LOC_A_MASK) == A_I),
         Piece("a2",
-              lambda s: ("CS", s[1], s[2], s[3], s[4]),
-              lambda s: s[0] == "W" and (s[4] == "Alice" or s[3] == "DOWN")),
+              lambda s: (s & ~LOC_A_MASK) | A_CS,
+              lambda s: (s & LOC_A_MASK) == A_W and (not (s & TURN_MASK) or not (s & FB_MASK))),
         Piece("a3",
-              lambda s: ("I", s[1], "DOWN", s[3], s[4]),
-              lambda s: s[0] == "CS"),
-        # Bob transitions
+              lambda s: (s & ~(LOC_A_MASK | FA_MASK)) | A_I,
+              lambda s: (s & LOC_A_MASK) == A_CS),
+        # Bob transitions (turn=Alice is the 0 bit)
         Piece("b1",
-              lambda s: (s[0], "W", s[2], "UP", "Alice"),
-              lambda s: s[1] == "I"),
+              lambda s: (s & ~(LOC_B_MASK | FB_MASK | TURN_MASK)) | B_W | FB_UP,
+              lambda s: (s & LOC_B_MASK) == B_I),
         Piece("b2",
-              lambda s: (s[0], "CS", s[2], s[3], s[4]),
-              lambda s: s[1] == "W" and (s[4] == "Bob" or s[2] == "DOWN")),
+              lambda s: (s & ~LOC_B_MASK) | B_CS,
+              lambda s: (s & LOC_B_MASK) == B_W and (s & TURN_MASK or not (s & FA_MASK))),
         Piece("b3",
-              lambda s: (s[0], "I", s[2], "DOWN", s[4]),
-              lambda s: s[1] == "CS"),
+              lambda s: (s & ~(LOC_B_MASK | FB_MASK)) | B_I,
+              lambda s: (s & LOC_B_MASK) == B_CS),
     ]
-    return Soup(pieces, ("I", "I", "DOWN", "DOWN", "Alice"))
+    return Soup(pieces, 0, STATE_DOMAIN)
 
 
 # =============================================================================
@@ -225,10 +231,117 @@ def get_model(name):
     return SoupLanguageSemantics(models[name]())
 
 
+def explore_batch(name, engine="numpy"):
+    """
+    Level-by-level BFS of a model with numpy (requires numpy).
+
+    Each level is expanded at once, with SoupLanguageSemantics.successors_batch
+    (engine="numpy") or with the compiled kernel of bfs_numba
+    (engine="numba", also requires numba).
+
+    Returns:
+        Boolean array over range(KEY_DOMAIN), True for reachable states
+    """
+    import numpy as np
+
+    sem = get_model(name)
+    if engine == "numba":
+        from bfs_numba import explore_levels
+        return explore_levels(sem.initials(), sem.successor_matrix()).astype(bool)
+    if engine != "numpy":
+        raise ValueError(f"Unknown engine: {engine}")
+
+    visited = np.zeros(KEY_DOMAIN, dtype=bool)
+    frontier = np.array(sem.initials())
+    visited[frontier] = True
+    while frontier.size:
+        frontier = sem.successors_batch(frontier, visited)
+        visited[frontier] = True
+    return visited
+
+
+def unpack_state(name, s):
+    """Readable tuple form of a packed state of the given model."""
+    return unpack(s, MODEL_FIELDS[name])
+
+
 # =============================================================================
-# Quick test
+# Tests
 # =============================================================================
 
+def _python_order(name):
+    """States of a model in the discovery order of the Python BFS engine."""
+    from ls2rg import LS2RG
+    from bfs import breadth_first_search
+
+    order = []
+    def on_entry(state, opaque):
+        opaque.append(state)
+        return False
+
+    breadth_first_search(LS2RG(get_model(name)), on_entry, order)
+    return order
+
+
+def test_native_bfs_engines():
+    """
+    breadth_first_search with engine="numba" or "igraph" visits the states
+    of the Python engine: numba in the same order, igraph level by level
+    (its order inside a level may differ). Skipped without the package.
+    """
+    from ls2rg import LS2RG
+    from bfs import breadth_first_search
+
+    def on_entry(state, opaque):
+        opaque.append(state)
+        return False
+
+    for engine in ("numba", "igraph"):
+        try:
+            __import__(engine)
+        except ImportError:
+            print(f"engine={engine}: skipped ({engine} not installed)")
+            continue
+        for name in MODEL_FIELDS:
+            expected = _python_order(name)
+            # BFS level of each state, from the Python discovery order
+            sem = get_model(name)
+            level = {state: 0 for state in sem.initials()}
+            for state in expected:
+                for n in sem.successors(state):
+                    level.setdefault(n, level[state] + 1)
+
+            order = []
+            _, visited = breadth_first_search(LS2RG(sem), on_entry, order, engine=engine)
+            assert visited == set(expected), f"{name}: {engine} visits other states"
+            assert sorted(order) == sorted(expected), f"{name}: {engine} repeats states"
+            if engine == "numba":
+                assert order == expected, f"{name}: numba order differs"
+            else:
+                levels = [level[state] for state in order]
+                assert levels == sorted(levels), f"{name}: igraph breaks the BFS levels"
+        print(f"engine={engine}: same visit order as the python engine")
+
+
+def test_explore_batch():
+    """
+    explore_batch reaches the states of the Python BFS engine, with numpy
+    and with numba. Skipped without the package.
+    """
+    for engine in ("numpy", "numba"):
+        try:
+            __import__(engine)
+        except ImportError:
+            print(f"explore_batch engine={engine}: skipped ({engine} not installed)")
+            continue
+        import numpy as np
+
+        for name in MODEL_FIELDS:
+            reached = np.flatnonzero(explore_batch(name, engine)).tolist()
+            assert reached == sorted(_python_order(name)), f"{name}: {engine} reaches other states"
+        print(f"explore_batch engine={engine}: same states as the python engine")
+
+
 if __name__ == "__main__":
     from ls2rg import LS2RG
     from bfs import breadth_first_search
@@ -244,3 +357,6 @@ if __name__ == "__main__":
 
         _, visited = breadth_first_search(rg, on_entry, count)
         print(f"{name}: {len(visited)} states")
+
+    test_native_bfs_engines()
+    test_explore_batch()
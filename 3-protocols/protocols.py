@@ -4,49 +4,114 @@ Encode AB1, AB2, AB3 as rooted directed graphs
 
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent / "1-bfs"))
+# Added once: importers that already put 1-bfs on sys.path (verification,
+# counter_examples) would otherwise get a duplicate entry to search
+_BFS_DIR = str(Path(__file__).parent.parent / "1-bfs")
+if _BFS_DIR not in sys.path:
+    sys.path.insert(0, _BFS_DIR)
+# common/ goes last: its bfs module must not shadow 1-bfs/bfs.py
+_COMMON_DIR = str(Path(__file__).parent.parent / "common")
+if _COMMON_DIR not in sys.path:
+    sys.path.append(_COMMON_DIR)
 
+from ab_state import (
+    LOC_A_SHIFT, LOC_B_SHIFT, FA_SHIFT, FB_SHIFT,
+    LOC_A_MASK, LOC_B_MASK, FA_MASK, FB_MASK,
+    A_I, A_W, A_CS, B_I, B_W, B_CS, FA_UP, FB_UP, KEY_DOMAIN,
+)
 from bfs import BFS
-from enum import Enum
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from enum import IntEnum
+from typing import Iterator, List
 
 
-class Location(Enum):
-    """Locations in the automaton"""
-    I = "I"  # Initial/Idle
-    W = "W"  # Waiting
-    CS = "CS"  # Critical Section
+class Location(IntEnum):
+    """Locations in the automaton (values are the 2-bit codes in State._k)"""
+    I = 0  # Initial/Idle
+    W = 1  # Waiting
+    CS = 2  # Critical Section
 
 
-class FlagState(Enum):
-    """Flag states"""
-    UP = "UP"
-    DOWN = "DOWN"
+class FlagState(IntEnum):
+    """Flag states (values are the codes in State._k)"""
+    DOWN = 0
+    UP = 1
+
+
+# Members indexed by their code, to decode State._k
+_LOCATIONS = tuple(Location)
+_FLAGS = tuple(FlagState)
+# Member names indexed by code, for State.__repr__
+_LOC_NAMES = tuple(loc.name for loc in Location)
+_FLAG_NAMES = tuple(flag.name for flag in FlagState)
+
+# Bit layout of State._k: the packed encoding of ab_state (also used by
+# the Soup models), with turn left at 0
+
+# Interned states: one State object per packed key (see State.get)
+_POOL = {}
 
 
 class State:
-    """Represents a global state of the system"""
-    
-    def __init__(self, alice_loc: Location, bob_loc: Location, 
-                 flag_alice: FlagState, flag_bob: FlagState):
-        self.alice_loc = alice_loc
-        self.bob_loc = bob_loc
-        self.flag_alice = flag_alice
-        self.flag_bob = flag_bob
-    
-    def __eq__(self, other):
-        if not isinstance(other, State):
-            return False
-        return (self.alice_loc == other.alice_loc and 
-                self.bob_loc == other.bob_loc and
-                self.flag_alice == other.flag_alice and
-                self.flag_bob == other.flag_bob)
+    """
+    Represents a global state of the system
+    
+    The 4 components are packed into the single int _k (ab_state layout),
+    which is also the hash. States are interned: there is a single State
+    object per key (State.get), so equality is identity and transitions
+    that reach a known state allocate nothing.
+    """
+    
+    __slots__ = ('_k',)
+    
+    def __new__(cls, alice_loc: Location, bob_loc: Location, 
+                flag_alice: FlagState, flag_bob: FlagState):
+        return cls.get(alice_loc << LOC_A_SHIFT | bob_loc << LOC_B_SHIFT |
+                       flag_alice << FA_SHIFT | flag_bob << FB_SHIFT)
+    
+    @classmethod
+    def get(cls, k: int) -> 'State':
+        """The interned state with packed key k"""
+        state = _POOL.get(k)
+        if state is None:
+            state = object.__new__(cls)
+            state._k = k
+            _POOL[k] = state
+        return state
+    
+    def key(self) -> int:
+        """Packed key in [0, KEY_DOMAIN), usable as a dense state id"""
+        return self._k
+    
+    @property
+    def alice_loc(self) -> Location:
+        return _LOCATIONS[(self._k & LOC_A_MASK) >> LOC_A_SHIFT]
+    
+    @property
+    def bob_loc(self) -> Location:
+        return _LOCATIONS[(self._k & LOC_B_MASK) >> LOC_B_SHIFT]
+    
+    @property
+    def flag_alice(self) -> FlagState:
+        return _FLAGS[(self._k & FA_MASK) >> FA_SHIFT]
+    
+    @property
+    def flag_bob(self) -> FlagState:
+        return _FLAGS[(self._k & FB_MASK) >> FB_SHIFT]
+    
+    # No __eq__: states are interned, the default identity test is exact
+    
+    def __reduce__(self):
+        # Pickled as its key, interned again on load (worker processes)
+        return (State.get, (self._k,))
     
     def __hash__(self):
-        return hash((self.alice_loc, self.bob_loc, self.flag_alice, self.flag_bob))
+        return self._k
     
     def __repr__(self):
-        return f"State(A:{self.alice_loc.value}, B:{self.bob_loc.value}, fA:{self.flag_alice.value}, fB:{self.flag_bob.value})"
+        k = self._k
+        return (f"State(A:{_LOC_NAMES[(k & LOC_A_MASK) >> LOC_A_SHIFT]}, B:{_LOC_NAMES[(k & LOC_B_MASK) >> LOC_B_SHIFT]}, "
+                f"fA:{_FLAG_NAMES[(k & FA_MASK) >> FA_SHIFT]}, fB:{_FLAG_NAMES[(k & FB_MASK) >> FB_SHIFT]})")
 
 
 class RootedGraph:
@@ -61,23 +126,23 @@ class RootedGraph:
     
     def get_successors(self, state: State) -> List[State]:
         """Get all possible successor states"""
-        successors = []
-        successors.extend(self.get_alice_transitions(state))
-        successors.extend(self.get_bob_transitions(state))
-        return successors
+        # One list filled straight from both generators
+        return [*self.get_alice_transitions(state), *self.get_bob_transitions(state)]
     
-    def get_alice_transitions(self, state: State) -> List[State]:
-        """Get possible transitions for Alice from current state"""
+    def get_alice_transitions(self, state: State) -> Iterator[State]:
+        """Yield possible transitions for Alice from current state"""
         raise NotImplementedError("Subclass must implement get_alice_transitions")
     
-    def get_bob_transitions(self, state: State) -> List[State]:
-        """Get possible transitions for Bob from current state"""
+    def get_bob_transitions(self, state: State) -> Iterator[State]:
+        """Yield possible transitions for Bob from current state"""
         raise NotImplementedError("Subclass must implement get_bob_transitions")
     
     def explore_with_bfs(self):
         """Explore the protocol state space using BFS"""
         bfs = BFS()
-        stats = bfs.explore(self.initial_state, self.get_successors)
+        # Keys are small dense ints: mark visited states in a bytearray
+        stats = bfs.explore(self.initial_state, self.get_successors,
+                            state_id_func=State.key, n_states=KEY_DOMAIN)
         return bfs, stats
 
 
@@ -91,35 +156,29 @@ class ProtocolAB1(RootedGraph):
     def __init__(self):
         super().__init__("AB1")
     
-    def get_alice_transitions(self, state: State) -> List[State]:
-        transitions = []
+    def get_alice_transitions(self, state: State) -> Iterator[State]:
+        k = state._k
+        loc = k & LOC_A_MASK
         
-        if state.alice_loc == Location.I:
+        if loc == A_I:
             # a1: I -> CS, raise flag
-            transitions.append(State(Location.CS, state.bob_loc, 
-                                   FlagState.UP, state.flag_bob))
+            yield State.get((k & ~(LOC_A_MASK | FA_MASK)) | A_CS | FA_UP)
         
-        elif state.alice_loc == Location.CS:
+        elif loc == A_CS:
             # a2: CS -> I, lower flag
-            transitions.append(State(Location.I, state.bob_loc, 
-                                   FlagState.DOWN, state.flag_bob))
-        
-        return transitions
+            yield State.get((k & ~(LOC_A_MASK | FA_MASK)) | A_I)
     
-    def get_bob_transitions(self, state: State) -> List[State]:
-        transitions = []
+    def get_bob_transitions(self, state: State) -> Iterator[State]:
+        k = state._k
+        loc = k & LOC_B_MASK
         
-        if state.bob_loc == Location.I:
+        if loc == B_I:
             # b1: I -> CS, raise flag
-            transitions.append(State(state.alice_loc, Location.CS, 
-                                   state.flag_alice, FlagState.UP))
+            yield State.get((k & ~(LOC_B_MASK | FB_MASK)) | B_CS | FB_UP)
         
-        elif state.bob_loc == Location.CS:
+        elif loc == B_CS:
             # b2: CS -> I, lower flag
-            transitions.append(State(state.alice_loc, Location.I, 
-                                   state.flag_alice, FlagState.DOWN))
-        
-        return transitions
+            yield State.get((k & ~(LOC_B_MASK | FB_MASK)) | B_I)
 
 
 class ProtocolAB2(RootedGraph):
@@ -132,47 +191,39 @@ class ProtocolAB2(RootedGraph):
     def __init__(self):
         super().__init__("AB2")
     
-    def get_alice_transitions(self, state: State) -> List[State]:
-        transitions = []
+    def get_alice_transitions(self, state: State) -> Iterator[State]:
+        k = state._k
+        loc = k & LOC_A_MASK
         
-        if state.alice_loc == Location.I:
+        if loc == A_I:
             # a1: I -> W, raise flag
-            transitions.append(State(Location.W, state.bob_loc, 
-                                   FlagState.UP, state.flag_bob))
+            yield State.get((k & ~(LOC_A_MASK | FA_MASK)) | A_W | FA_UP)
         
-        elif state.alice_loc == Location.W:
+        elif loc == A_W:
             # a3: W -> CS if Bob's flag is down
-            if state.flag_bob == FlagState.DOWN:
-                transitions.append(State(Location.CS, state.bob_loc, 
-                                       state.flag_alice, state.flag_bob))
+            if not k & FB_MASK:
+                yield State.get((k & ~LOC_A_MASK) | A_CS)
         
-        elif state.alice_loc == Location.CS:
+        elif loc == A_CS:
             # a2: CS -> I, lower flag
-            transitions.append(State(Location.I, state.bob_loc, 
-                                   FlagState.DOWN, state.flag_bob))
-        
-        return transitions
+            yield State.get((k & ~(LOC_A_MASK | FA_MASK)) | A_I)
     
-    def get_bob_transitions(self, state: State) -> List[State]:
-        transitions = []
+    def get_bob_transitions(self, state: State) -> Iterator[State]:
+        k = state._k
+        loc = k & LOC_B_MASK
         
-        if state.bob_loc == Location.I:
+        if loc == B_I:
             # b1: I -> W, raise flag
-            transitions.append(State(state.alice_loc, Location.W, 
-                                   state.flag_alice, FlagState.UP))
+            yield State.get((k & ~(LOC_B_MASK | FB_MASK)) | B_W | FB_UP)
         
-        elif state.bob_loc == Location.W:
+        elif loc == B_W:
             # b3: W -> CS if Alice's flag is down
-            if state.flag_alice == FlagState.DOWN:
-                transitions.append(State(state.alice_loc, Location.CS, 
-                                       state.flag_alice, state.flag_bob))
+            if not k & FA_MASK:
+                yield State.get((k & ~LOC_B_MASK) | B_CS)
         
-        elif state.bob_loc == Location.CS:
+        elif loc == B_CS:
             # b2: CS -> I, lower flag
-            transitions.append(State(state.alice_loc, Location.I, 
-                                   state.flag_alice, FlagState.DOWN))
-        
-        return transitions
+            yield State.get((k & ~(LOC_B_MASK | FB_MASK)) | B_I)
 
 
 class ProtocolAB3(RootedGraph):
@@ -186,69 +237,79 @@ class ProtocolAB3(RootedGraph):
     def __init__(self):
         super().__init__("AB3")
     
-    def get_alice_transitions(self, state: State) -> List[State]:
-        transitions = []
+    def get_alice_transitions(self, state: State) -> Iterator[State]:
+        k = state._k
+        loc = k & LOC_A_MASK
         
-        if state.alice_loc == Location.I:
+        if loc == A_I:
             # a3: I -> W, raise flag
-            transitions.append(State(Location.W, state.bob_loc, 
-                                   FlagState.UP, state.flag_bob))
+            yield State.get((k & ~(LOC_A_MASK | FA_MASK)) | A_W | FA_UP)
         
-        elif state.alice_loc == Location.W:
-            if state.flag_alice == FlagState.UP:
+        elif loc == A_W:
+            if k & FA_MASK:
                 # a2: W -> W, lower flag if Bob's flag is up
-                if state.flag_bob == FlagState.UP:
-                    transitions.append(State(Location.W, state.bob_loc, 
-                                           FlagState.DOWN, state.flag_bob))
+                if k & FB_MASK:
+                    yield State.get(k & ~FA_MASK)
                 else:
                     # Alice's flag up, Bob's down -> enter CS
-                    transitions.append(State(Location.CS, state.bob_loc, 
-                                           state.flag_alice, state.flag_bob))
+                    yield State.get((k & ~LOC_A_MASK) | A_CS)
             else:  # Alice's flag is DOWN
                 # a1: W -> W, raise flag (after waiting)
-                transitions.append(State(Location.W, state.bob_loc, 
-                                       FlagState.UP, state.flag_bob))
+                yield State.get(k | FA_UP)
         
-        elif state.alice_loc == Location.CS:
+        elif loc == A_CS:
             # Exit CS and lower flag
-            transitions.append(State(Location.I, state.bob_loc, 
-                                   FlagState.DOWN, state.flag_bob))
-        
-        return transitions
+            yield State.get((k & ~(LOC_A_MASK | FA_MASK)) | A_I)
     
-    def get_bob_transitions(self, state: State) -> List[State]:
-        transitions = []
+    def get_bob_transitions(self, state: State) -> Iterator[State]:
+        k = state._k
+        loc = k & LOC_B_MASK
         
-        if state.bob_loc == Location.I:
+        if loc == B_I:
             # b1: I -> W, raise flag
-            transitions.append(State(state.alice_loc, Location.W, 
-                                   state.flag_alice, FlagState.UP))
+            yield State.get((k & ~(LOC_B_MASK | FB_MASK)) | B_W | FB_UP)
         
-        elif state.bob_loc == Location.W:
-            if state.flag_bob == FlagState.UP:
+        elif loc == B_W:
+            if k & FB_MASK:
                 # b2: W -> W, lower flag if Alice's flag is up
-                if state.flag_alice == FlagState.UP:
-                    transitions.append(State(state.alice_loc, Location.W, 
-                                           state.flag_alice, FlagState.DOWN))
+                if k & FA_MASK:
+                    yield State.get(k & ~FB_MASK)
                 else:
                     # Bob's flag up, Alice's down -> enter CS
-                    transitions.append(State(state.alice_loc, Location.CS, 
-                                           state.flag_alice, state.flag_bob))
+                    yield State.get((k & ~LOC_B_MASK) | B_CS)
             else:  # Bob's flag is DOWN
                 # b4: W -> W, raise flag (after waiting)
-                transitions.append(State(state.alice_loc, Location.W, 
-                                       state.flag_alice, FlagState.UP))
+                yield State.get(k | FB_UP)
         
-        elif state.bob_loc == Location.CS:
+        elif loc == B_CS:
             # Exit CS and lower flag
-            transitions.append(State(state.alice_loc, Location.I, 
-                                   state.flag_alice, FlagState.DOWN))
-        
-        return transitions
+            yield State.get((k & ~(LOC_B_MASK | FB_MASK)) | B_I)
+
+
+PROTOCOLS = {"AB1": ProtocolAB1, "AB2": ProtocolAB2, "AB3": ProtocolAB3}
 
 
-def test_protocol_encoding(protocol):
-    """Test that a protocol is correctly encoded as rooted graph"""
+def explore_protocol(name: str):
+    """
+    Explore one protocol by name; run in worker processes, so only the
+    name and the resulting counts cross process boundaries.
+    
+    Returns:
+        (name, total_states, total_transitions)
+    """
+    bfs, stats = PROTOCOLS[name]().explore_with_bfs()
+    return name, stats['total_states'], stats['total_transitions']
+
+
+def test_protocol_encoding(protocol, stats=None):
+    """
+    Test that a protocol is correctly encoded as rooted graph
+    
+    Args:
+        protocol: The protocol to test
+        stats: Exploration stats computed elsewhere (explore_protocol);
+               the protocol is explored here when omitted
+    """
     print(f"\n{'='*60}")
     print(f"Testing Protocol {protocol.name}")
     print(f"{'='*60}")
@@ -257,7 +318,9 @@ def test_protocol_encoding(protocol):
     print(f"Initial state (root): {protocol.initial_state}")
     
     # Explore state space
-    bfs, stats = protocol.explore_with_bfs()
+    bfs = None
+    if stats is None:
+        bfs, stats = protocol.explore_with_bfs()
     
     print(f"\nRooted Graph Properties:")
     print(f"  - Root node: {protocol.initial_state}")
@@ -282,16 +345,15 @@ if __name__ == "__main__":
     print("#"*60)
     print("\nEncoding AB1, AB2, AB3 using RootedGraph abstraction...\n")
     
-    protocols = [
-        ProtocolAB1(),
-        ProtocolAB2(),
-        ProtocolAB3()
-    ]
+    # Protocols are independent: explore them in parallel, report in order
+    with ProcessPoolExecutor() as executor:
+        explored = list(executor.map(explore_protocol, PROTOCOLS))
     
     results = []
-    for protocol in protocols:
-        bfs, stats = test_protocol_encoding(protocol)
-        results.append((protocol.name, stats))
+    for name, total_states, total_transitions in explored:
+        stats = {'total_states': total_states, 'total_transitions': total_transitions}
+        test_protocol_encoding(PROTOCOLS[name](), stats)
+        results.append((name, stats))
     
     # Summary table
     print("\n" + "="*60)
@@ -4,12 +4,24 @@ Verify mutual exclusion and deadlock properties for AB1, AB2, AB3
 
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent / "1-bfs"))
-sys.path.insert(0, str(Path(__file__).parent.parent / "3-protocols"))
+# Each directory added once, so repeated imports do not grow sys.path
+for _dir in ("1-bfs", "3-protocols"):
+    _path = str(Path(__file__).parent.parent / _dir)
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
 
-from protocols import ProtocolAB1, ProtocolAB2, ProtocolAB3, Location, State
+from protocols import ProtocolAB1, ProtocolAB2, ProtocolAB3, PROTOCOLS, Location, State
+from array import array
 from bfs import BFS
-from typing import List, Set
+from concurrent.futures import ProcessPoolExecutor
+
+# Cached member for the hot checks (IntEnum: compared as a plain int)
+_CS = Location.CS
+
+
+def _both_in_cs(state) -> bool:
+    """Mutual exclusion violation: Alice and Bob both in CS"""
+    return state.alice_loc == _CS and state.bob_loc == _CS
 
 
 class PropertyVerifier:
@@ -19,25 +31,44 @@ class PropertyVerifier:
     
     def __init__(self, protocol):
         self.protocol = protocol
-        self.bfs = BFS()
-        self.violation_states: List[State] = []
-        self.deadlock_states: List[State] = []
+        # Successor lists are kept (bfs.graph) for verify_deadlock_freedom
+        self.bfs = BFS(build_graph=True)
+        # Early-stopping search of verify_mutual_exclusion (its parent
+        # pointers give the shortest trace to the witness)
+        self.mutex_bfs = None
+        # Witnesses are kept as packed keys (State.key), 2 bytes each;
+        # State.get(key) gives the state back when it is printed
+        self.violation_keys = array('H')
+        self.deadlock_keys = array('H')
+    
+    def _is_deadlock(self, state, successors) -> bool:
+        """Deadlock: no successors and not initial state"""
+        return not successors and state is not self.protocol.initial_state
     
     def verify_mutual_exclusion(self) -> bool:
         """
         Verify mutual exclusion property:
         Alice and Bob should never both be in Critical Section simultaneously
         
+        The search stops at the first violating state, whose key is kept
+        as the only entry of self.violation_keys (one witness is enough).
+        
         Returns:
             True if property is satisfied, False if violated
         """
-        self.violation_states = []
+        self.violation_keys = array('H')
         
-        for state in self.bfs.visited:
-            if state.alice_loc == Location.CS and state.bob_loc == Location.CS:
-                self.violation_states.append(state)
+        # Separate BFS so self.bfs keeps the full exploration, if any
+        bfs = self.mutex_bfs = BFS()
+        bfs.explore(
+            self.protocol.initial_state,
+            self.protocol.get_successors,
+            is_goal=_both_in_cs
+        )
+        if bfs.goal is not None:
+            self.violation_keys.append(bfs.goal.key())
         
-        return len(self.violation_states) == 0
+        return len(self.violation_keys) == 0
     
     def verify_deadlock_freedom(self) -> bool:
         """
@@ -48,29 +79,42 @@ class PropertyVerifier:
         Returns:
             True if deadlock-free, False if deadlock exists
         """
-        self.deadlock_states = []
+        self.deadlock_keys = array('H')
+        
+        # Reuse the successor lists recorded by a previous exploration
+        if not self.bfs.graph:
+            self.bfs.explore(self.protocol.initial_state, self.protocol.get_successors)
         
-        for state in self.bfs.visited:
-            successors = self.protocol.get_successors(state)
-            # Deadlock: no successors and not initial state
-            if len(successors) == 0 and state != self.protocol.initial_state:
-                self.deadlock_states.append(state)
+        for state, successors in self.bfs.graph.items():
+            if self._is_deadlock(state, successors):
+                self.deadlock_keys.append(state.key())
         
-        return len(self.deadlock_states) == 0
+        return len(self.deadlock_keys) == 0
     
     def verify_all_properties(self):
         """
         Explore state space and verify all properties
         """
-        # First explore the state space
+        self.violation_keys = violation_keys = array('H')
+        self.deadlock_keys = deadlock_keys = array('H')
+        is_deadlock = self._is_deadlock
+        
+        # Both properties are checked on each state as BFS expands it,
+        # from the successors BFS computes anyway (single pass)
+        def check_state(state, successors):
+            if _both_in_cs(state):
+                violation_keys.append(state.key())
+            if is_deadlock(state, successors):
+                deadlock_keys.append(state.key())
+        
         stats = self.bfs.explore(
             self.protocol.initial_state,
-            self.protocol.get_successors
+            self.protocol.get_successors,
+            on_expand=check_state
         )
         
-        # Then verify properties
-        mutex_satisfied = self.verify_mutual_exclusion()
-        deadlock_free = self.verify_deadlock_freedom()
+        mutex_satisfied = len(violation_keys) == 0
+        deadlock_free = len(deadlock_keys) == 0
         
         return {
             'protocol': self.protocol.name,
@@ -78,8 +122,8 @@ class PropertyVerifier:
             'total_transitions': stats['total_transitions'],
             'mutual_exclusion': mutex_satisfied,
             'deadlock_free': deadlock_free,
-            'violation_states': self.violation_states.copy(),
-            'deadlock_states': self.deadlock_states.copy()
+            'violation_keys': array('H', violation_keys),
+            'deadlock_keys': array('H', deadlock_keys)
         }
     
     def print_results(self, results):
@@ -97,39 +141,48 @@ class PropertyVerifier:
         mutex_status = "+ SATISFIED" if results['mutual_exclusion'] else "- VIOLATED"
         print(f"  Mutual Exclusion: {mutex_status}")
         if not results['mutual_exclusion']:
-            print(f"    Violations found: {len(results['violation_states'])}")
-            for state in results['violation_states'][:2]:
-                print(f"      - {state}")
+            print(f"    Violations found: {len(results['violation_keys'])}")
+            for key in results['violation_keys'][:2]:
+                print(f"      - {State.get(key)}")
         
         # Deadlock Freedom
         deadlock_status = "+ NO DEADLOCK" if results['deadlock_free'] else "- HAS DEADLOCK"
         print(f"  Deadlock Freedom: {deadlock_status}")
         if not results['deadlock_free']:
-            print(f"    Deadlock states: {len(results['deadlock_states'])}")
-            for state in results['deadlock_states'][:2]:
-                print(f"      - {state}")
+            print(f"    Deadlock states: {len(results['deadlock_keys'])}")
+            for key in results['deadlock_keys'][:2]:
+                print(f"      - {State.get(key)}")
 
 
-def verify_protocol(protocol):
-    """Verify a single protocol"""
+def run_verification(name: str):
+    """
+    Verify one protocol by name without printing; run in worker
+    processes (states in the results are pickled as their packed key).
+    """
+    return PropertyVerifier(PROTOCOLS[name]()).verify_all_properties()
+
+
+def verify_protocol(protocol, results=None):
+    """Verify a single protocol, or only print precomputed results"""
     verifier = PropertyVerifier(protocol)
-    results = verifier.verify_all_properties()
+    if results is None:
+        results = verifier.verify_all_properties()
     verifier.print_results(results)
     return results
 
 
-def test_ab1_verification():
+def test_ab1_verification(results=None):
     """Test AB1 - Should violate mutual exclusion but no deadlock"""
     print("\n" + "="*60)
     print("TEST 1: Verify Protocol AB1")
     print("="*60)
     
     protocol = ProtocolAB1()
-    results = verify_protocol(protocol)
+    results = verify_protocol(protocol, results)
     
     # AB1 should NOT have mutual exclusion
     assert not results['mutual_exclusion'], "AB1 should violate mutual exclusion"
-    assert len(results['violation_states']) > 0, "Should find violation states"
+    assert len(results['violation_keys']) > 0, "Should find violation states"
     
     # AB1 should be deadlock-free
     assert results['deadlock_free'], "AB1 should be deadlock-free"
@@ -140,21 +193,21 @@ def test_ab1_verification():
     return results
 
 
-def test_ab2_verification():
+def test_ab2_verification(results=None):
     """Test AB2 - Should have mutual exclusion but has deadlock"""
     print("\n" + "="*60)
     print("TEST 2: Verify Protocol AB2")
     print("="*60)
     
     protocol = ProtocolAB2()
-    results = verify_protocol(protocol)
+    results = verify_protocol(protocol, results)
     
     # AB2 should have mutual exclusion
     assert results['mutual_exclusion'], "AB2 should satisfy mutual exclusion"
     
     # AB2 should have deadlock
     assert not results['deadlock_free'], "AB2 should have deadlock"
-    assert len(results['deadlock_states']) > 0, "Should find deadlock states"
+    assert len(results['deadlock_keys']) > 0, "Should find deadlock states"
     
     print("\n+ AB2 verification correct!")
     print("  Expected: Mutual exclusion, Has deadlock")
@@ -162,14 +215,14 @@ def test_ab2_verification():
     return results
 
 
-def test_ab3_verification():
+def test_ab3_verification(results=None):
     """Test AB3 - Should have mutual exclusion AND be deadlock-free"""
     print("\n" + "="*60)
     print("TEST 3: Verify Protocol AB3")
     print("="*60)
     
     protocol = ProtocolAB3()
-    results = verify_protocol(protocol)
+    results = verify_protocol(protocol, results)
     
     # AB3 should have mutual exclusion
     assert results['mutual_exclusion'], "AB3 should satisfy mutual exclusion"
@@ -215,10 +268,14 @@ if __name__ == "__main__":
     print("#"*60)
     print("\nVerifying mutual exclusion and deadlock for each protocol...\n")
     
-    # Verify each protocol
-    results_ab1 = test_ab1_verification()
-    results_ab2 = test_ab2_verification()
-    results_ab3 = test_ab3_verification()
+    # Protocols are independent: verify them in parallel, then check
+    # and print the results in order
+    with ProcessPoolExecutor() as executor:
+        computed = list(executor.map(run_verification, ["AB1", "AB2", "AB3"]))
+    
+    results_ab1 = test_ab1_verification(computed[0])
+    results_ab2 = test_ab2_verification(computed[1])
+    results_ab3 = test_ab3_verification(computed[2])
     
     # Generate comparison table
     all_results = [results_ab1, results_ab2, results_ab3]
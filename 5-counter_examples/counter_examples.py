@@ -12,6 +12,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "4-verification"))
 from protocols import ProtocolAB1, ProtocolAB2, ProtocolAB3, State
 from verification import PropertyVerifier
 from bfs import BFS
+from functools import cached_property
 
 
 class CounterExampleGenerator:
@@ -23,25 +24,44 @@ class CounterExampleGenerator:
     def __init__(self, protocol):
         self.protocol = protocol
         self.verifier = PropertyVerifier(protocol)
-        # Run verification to populate violation/deadlock states
-        self.results = self.verifier.verify_all_properties()
     
-    def generate_trace_to_state(self, target_state: State):
+    # Each property is verified on first use only, so a caller that
+    # needs a single counter-example runs a single check
+    
+    @cached_property
+    def _mutex_violation(self):
+        """First state violating mutual exclusion, None if satisfied"""
+        if self.verifier.verify_mutual_exclusion():
+            return None
+        return State.get(self.verifier.violation_keys[0])
+    
+    @cached_property
+    def _deadlock(self):
+        """First deadlock state, None if deadlock-free"""
+        if self.verifier.verify_deadlock_freedom():
+            return None
+        return State.get(self.verifier.deadlock_keys[0])
+    
+    def generate_trace_to_state(self, target_state: State, bfs: BFS = None):
         """
         Generate execution trace from initial state to target state
         Uses BFS parent pointers (already implemented in BFS)
         
         Args:
             target_state: The state to reach
+            bfs: Search whose parent pointers are used (default: the
+                 verifier's full exploration)
             
         Returns:
             List of states forming the trace, or empty list if unreachable
         """
-        if target_state not in self.verifier.bfs.visited:
+        if bfs is None:
+            bfs = self.verifier.bfs
+        if target_state not in bfs.visited:
             return []
         
         # Use BFS get_path method (no modification needed!)
-        trace = self.verifier.bfs.get_path(
+        trace = bfs.get_path(
             self.protocol.initial_state,
             target_state
         )
@@ -53,14 +73,13 @@ class CounterExampleGenerator:
         Generate counter-example for mutual exclusion violation
         Returns trace leading to state where both processes in CS
         """
-        if self.results['mutual_exclusion']:
-            return None  # No violation, no counter-example
-        
         # Get first violation state
-        violation_state = self.results['violation_states'][0]
+        violation_state = self._mutex_violation
+        if violation_state is None:
+            return None  # No violation, no counter-example
         
-        # Generate trace using existing BFS
-        trace = self.generate_trace_to_state(violation_state)
+        # Generate trace using existing BFS (the search that found it)
+        trace = self.generate_trace_to_state(violation_state, self.verifier.mutex_bfs)
         
         return {
             'property': 'Mutual Exclusion',
@@ -75,11 +94,10 @@ class CounterExampleGenerator:
         Generate counter-example for deadlock
         Returns trace leading to deadlock state
         """
-        if self.results['deadlock_free']:
-            return None  # No deadlock, no counter-example
-        
         # Get first deadlock state
-        deadlock_state = self.results['deadlock_states'][0]
+        deadlock_state = self._deadlock
+        if deadlock_state is None:
+            return None  # No deadlock, no counter-example
         
         # Generate trace using existing BFS
         trace = self.generate_trace_to_state(deadlock_state)
@@ -5,15 +5,17 @@ Produces counter-examples in (prefix-trace, cyclic-suffix-trace) form.
 """
 
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 # Add paths
 sys.path.insert(0, str(Path(__file__).parent.parent / "common"))
 sys.path.insert(0, str(Path(__file__).parent.parent / "3-protocols"))
 
-from ab_models_soup import get_model
+from ab_models_soup import get_model, unpack_state
 from isoup import get_isoup_property
-from buchi import verify_buchi, format_counter_example
+from buchi import verify_buchi, format_counter_example, CycleSearchWorkspace
 
 
 MODEL_NAMES = ["AB1", "AB2", "AB3", "AB4", "AB5"]
@@ -27,25 +29,62 @@ PROPERTY_DESCRIPTIONS = {
 }
 
 
+# Each model (with its precomputed tables) is built once per process and
+# shared by every pair using it, like the properties (get_isoup_property
+# returns one instance per name). verify_buchi only reads them: the
+# per-pair caches live in the composition
+@lru_cache(maxsize=None)
+def _get_model(model_name):
+    return get_model(model_name)
+
+
+# Cycle search buffers reused by every verification of this process
+_WORKSPACE = CycleSearchWorkspace()
+
+
 def verify_one(model_name, prop_name):
     """Verify a single (model, property) pair."""
-    system_ls = get_model(model_name)          # Soup Sem
+    system_ls = _get_model(model_name)          # Soup Sem
     property_ls = get_isoup_property(prop_name) # iSoup Sem
-    satisfied, ce = verify_buchi(system_ls, property_ls)  # Composition + BFS + cycle
+    satisfied, ce = verify_buchi(system_ls, property_ls, _WORKSPACE)  # Composition + BFS + cycle
     return satisfied, ce
 
 
-def run_all_verifications():
-    """Run all 25 (model, property) pairs and collect results."""
-    results = {}
+def _verify_pair(pair):
+    """verify_one for a (model, property) pair, run in worker processes."""
+    return verify_one(*pair)
+
+
+def run_all_verifications(workers=None):
+    """
+    Run all 25 (model, property) pairs and collect results.
+
+    The pairs are independent: they are verified in parallel worker
+    processes (only names go in, plain tuples come back) and reported
+    in order.
 
-    for model_name in MODEL_NAMES:
-        for prop_name in PROPERTY_NAMES:
+    Args:
+        workers: Number of worker processes (default: one per CPU).
+                 1 verifies the pairs in this process, without a pool
+    """
+    results = {}
+    pairs = [(m, p) for m in MODEL_NAMES for p in PROPERTY_NAMES]
+
+    if workers == 1:
+        outcomes = map(_verify_pair, pairs)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        outcomes = executor.map(_verify_pair, pairs)
+    try:
+        for (model_name, prop_name), (satisfied, ce) in zip(pairs, outcomes):
             print(f"Verifying {model_name} x {prop_name}...", end=" ", flush=True)
-            satisfied, ce = verify_one(model_name, prop_name)
             status = "SATISFIED" if satisfied else "VIOLATED"
             print(status)
             results[(model_name, prop_name)] = (satisfied, ce)
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
     return results
 
@@ -86,7 +125,7 @@ def print_counter_examples(results):
             if not satisfied:
                 any_violated = True
                 print(f"\n--- {m} x {p} ({PROPERTY_DESCRIPTIONS[p]}) ---")
-                print(format_counter_example(ce))
+                print(format_counter_example(ce, lambda s: unpack_state(m, s)))
 
     if not any_violated:
         print("\nNo violations found - all properties satisfied.")
@@ -140,7 +179,7 @@ def generate_markdown(results):
                 any_violated = True
                 lines.append(f"### {m} x {p} - {PROPERTY_DESCRIPTIONS[p]}")
                 lines.append("```")
-                lines.append(format_counter_example(ce))
+                lines.append(format_counter_example(ce, lambda s: unpack_state(m, s)))
                 lines.append("```")
                 lines.append("")
 
@@ -163,6 +202,39 @@ def generate_markdown(results):
     return "\n".join(lines)
 
 
+def test_numba_cycle_search(results):
+    """
+    The numba SCC kernel (buchi_numba.cyclic_components) numbers the same
+    components as buchi._cyclic_components on all 25 composed graphs,
+    with and without the accepting early exit, and
+    verify_buchi(engine="numba") gives the verdicts of the python path.
+    Skipped without numba.
+    """
+    try:
+        __import__("numba")
+    except ImportError:
+        print("\nengine=numba: skipped (numba not installed)")
+        return
+    from bfs import breadth_first_search
+    from buchi import ProductRecorder, _cyclic_components, _numba_cyclic_components
+    from step_sync_composition import StepSyncComposition
+
+    for m in MODEL_NAMES:
+        for p in PROPERTY_NAMES:
+            # Whole composed graph, recorded in CSR form
+            rg = ProductRecorder(StepSyncComposition(_get_model(m), get_isoup_property(p)))
+            breadth_first_search(rg, lambda state, opaque: False, None)
+            no_accepting = bytearray(len(rg.accepting))
+            for accepting in (rg.accepting, no_accepting):
+                expected = list(_cyclic_components(rg.indptr, rg.indices, None, accepting))
+                component = _numba_cyclic_components(rg.indptr, rg.indices, accepting)
+                assert component.tolist() == expected, f"{m} x {p}: SCCs differ"
+
+            satisfied, _ = verify_buchi(_get_model(m), get_isoup_property(p), engine="numba")
+            assert satisfied == results[(m, p)][0], f"{m} x {p}: verdicts differ"
+    print("\nengine=numba: same SCCs and verdicts as the python cycle search")
+
+
 if __name__ == "__main__":
     print("=" * 70)
     print("BUCHI VERIFICATION - ALICE & BOB PROTOCOLS")
@@ -178,6 +250,8 @@ if __name__ == "__main__":
     # Print counter-examples
     print_counter_examples(results)
 
+    test_numba_cycle_search(results)
+
     # Generate markdown
     md_content = generate_markdown(results)
     md_path = Path(__file__).parent / "VerificationBuchiAliceBob.md"
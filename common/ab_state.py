@@ -0,0 +1,70 @@
+"""
+Packed integer encoding of the Alice & Bob system states.
+
+A state is a single int with one bit field per component:
+  bits 0-1: Alice's location    bits 2-3: Bob's location
+  bit 4:    flagAlice           bit 5:    flagBob
+  bit 6:    turn (AB5 only)
+Components a model does not have (flags in AB1, turn before AB5) stay 0,
+i.e. DOWN / Alice. Hashing or comparing a state is then one int operation
+and guards are mask tests like (s & LOC_A_MASK) == A_CS.
+"""
+
+# Field values
+I, W, CS, R = 0, 1, 2, 3
+DOWN, UP = 0, 1
+ALICE, BOB = 0, 1
+
+# Field positions
+LOC_A_SHIFT = 0
+LOC_B_SHIFT = 2
+FA_SHIFT = 4
+FB_SHIFT = 5
+TURN_SHIFT = 6
+
+LOC_A_MASK = 0b11 << LOC_A_SHIFT
+LOC_B_MASK = 0b11 << LOC_B_SHIFT
+FA_MASK = 1 << FA_SHIFT
+FB_MASK = 1 << FB_SHIFT
+TURN_MASK = 1 << TURN_SHIFT
+
+# Every packed state is in range(KEY_DOMAIN)
+KEY_DOMAIN = 1 << (TURN_SHIFT + 1)
+
+# Field values already shifted in place
+A_I, A_W, A_CS, A_R = (loc << LOC_A_SHIFT for loc in (I, W, CS, R))
+B_I, B_W, B_CS, B_R = (loc << LOC_B_SHIFT for loc in (I, W, CS, R))
+FA_UP = UP << FA_SHIFT
+FB_UP = UP << FB_SHIFT
+TURN_BOB = BOB << TURN_SHIFT
+
+# Names used by the original tuple states, for printing
+LOC_NAMES = ("I", "W", "CS", "R")
+FLAG_NAMES = ("DOWN", "UP")
+TURN_NAMES = ("Alice", "Bob")
+
+
+def pack(alice_loc, bob_loc, flag_alice=DOWN, flag_bob=DOWN, turn=ALICE):
+    """Build the packed state from its field values."""
+    return (alice_loc << LOC_A_SHIFT | bob_loc << LOC_B_SHIFT |
+            flag_alice << FA_SHIFT | flag_bob << FB_SHIFT | turn << TURN_SHIFT)
+
+
+def unpack(s, n_fields=5):
+    """
+    Decode a packed state to the readable tuple form, e.g.
+    ('W', 'I', 'UP', 'DOWN'). Only used for printing.
+
+    Args:
+        s: packed state
+        n_fields: number of components of the model (2 for AB1,
+                  4 for AB2-AB4, 5 for AB5)
+    """
+    fields = (
+        LOC_NAMES[(s & LOC_A_MASK) >> LOC_A_SHIFT],
+        LOC_NAMES[(s & LOC_B_MASK) >> LOC_B_SHIFT],
+        FLAG_NAMES[(s & FA_MASK) >> FA_SHIFT],
+        FLAG_NAMES[(s & FB_MASK) >> FB_SHIFT],
+        TURN_NAMES[(s & TURN_MASK) >> TURN_SHIFT],
+    )
+    return fields[:n_fields]
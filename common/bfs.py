@@ -2,7 +2,7 @@ from collections import deque
 
 
 # Fonction BFS pour les graphes enracines (RootedGraph)
-def breadth_first_search(rooted_graph, on_entry, opaque):
+def breadth_first_search(rooted_graph, on_entry, opaque, engine="python"):
     """
     BFS pour les graphes enracines.
 
@@ -11,31 +11,101 @@ def breadth_first_search(rooted_graph, on_entry, opaque):
         on_entry: Callback appele pour chaque etat visite.
                   Retourne True pour arreter le parcours.
         opaque: Donnees passees au callback
+        engine: "python" (defaut), ou un parcours compile quand le graphe
+                expose csr() (etats entiers) ; on_entry est appele ensuite
+                sur l'ordre de decouverte calcule :
+                - "numba" : bfs_numba.bfs_order (numpy et numba requis),
+                  meme ordre que le parcours Python
+                - "igraph" : Graph.bfs de python-igraph (numpy et igraph
+                  requis) ; l'ordre dans un niveau peut differer (igraph
+                  parcourt les voisins par identifiant croissant)
+                Sans csr(), le parcours Python est utilise.
+                Les moteurs compiles parcourent tout le graphe avant le
+                premier appel a on_entry : un retour True evite les appels
+                suivants, pas le parcours. Pour un arret precoce qui
+                economise l'exploration, garder engine="python"
 
     Returns:
         Tuple (opaque, visited_states)
     """
+    if engine not in ("python", "numba", "igraph"):
+        raise ValueError(f"Unknown engine: {engine}")
+    if engine != "python":
+        csr = getattr(rooted_graph, "csr", None)
+        csr = csr() if csr is not None else None
+        if csr is not None:
+            return _native_search(rooted_graph.roots(), csr, on_entry, opaque, engine)
+
     visited = set()
     queue = deque()
+    # Methodes liees une fois, hors de la boucle
+    mark = visited.add
+    enqueue = queue.append
+    dequeue = queue.popleft
+    neighbors = rooted_graph.neighbors
+
+    # Un etat est marque au moment ou il est decouvert, juste avant
+    # d'entrer dans la queue : un seul test d'appartenance par arc et
+    # jamais de doublon dans la queue
 
     # Ajouter toutes les racines a la queue
     for root in rooted_graph.roots():
-        if root not in visited:
-            visited.add(root)
-            queue.append(root)
-            if on_entry(root, opaque):
-                return opaque, visited
+        if root in visited:
+            continue
+        mark(root)
+        if on_entry(root, opaque):
+            return opaque, visited
+        enqueue(root)
 
     # Parcours BFS
     while queue:
-        current = queue.popleft()
+        current = dequeue()
 
         # Explorer les voisins
-        for neighbor in rooted_graph.neighbors(current):
-            if neighbor not in visited:
-                visited.add(neighbor)
-                if on_entry(neighbor, opaque):
-                    return opaque, visited
-                queue.append(neighbor)
+        for neighbor in neighbors(current):
+            if neighbor in visited:
+                continue
+            mark(neighbor)
+            if on_entry(neighbor, opaque):
+                return opaque, visited
+            enqueue(neighbor)
 
     return opaque, visited
+
+
+# Parcours compile sur le graphe CSR : l'ordre de decouverte est calcule
+# d'un coup (parcours complet), puis on_entry est rejoue dans cet ordre.
+# Arret sur True : visited contient les etats decouverts jusque-la, comme
+# le parcours Python, mais le parcours natif a deja tout explore
+def _native_search(roots, csr, on_entry, opaque, engine):
+    import numpy as np
+
+    indptr, indices = csr
+    if engine == "numba":
+        from bfs_numba import bfs_order
+        order = bfs_order(np.asarray(roots, dtype=np.int64), indptr, indices).tolist()
+    else:
+        order = _igraph_order(roots, indptr, indices)
+
+    visited = set()
+    for state in order:
+        visited.add(state)
+        if on_entry(state, opaque):
+            break
+    return opaque, visited
+
+
+# Ordre de decouverte calcule par igraph (en C). Un sommet virtuel n,
+# relie a toutes les racines, permet un seul parcours depuis toutes
+def _igraph_order(roots, indptr, indices):
+    import numpy as np
+    import igraph
+
+    n = len(indptr) - 1
+    sources = np.repeat(np.arange(n), np.diff(indptr))
+    edges = list(zip(sources.tolist(), indices.tolist()))
+    edges.extend((n, root) for root in roots)
+    graph = igraph.Graph(n=n + 1, edges=edges, directed=True)
+    vids, _, _ = graph.bfs(n, mode="out")
+    # vids commence par le sommet virtuel
+    return vids[1:]
@@ -0,0 +1,93 @@
+"""
+Numba-compiled level expansion for BFS over dense integer states.
+
+The successor relation is given as a matrix M (see
+SoupLanguageSemantics.successor_matrix): M[s, k] is the k-th successor
+of state s, -1 when s has fewer successors. expand_level expands a whole
+BFS level inside one @njit kernel, marking new states in a uint8 array.
+
+bfs_order runs a whole BFS over a CSR graph (see
+SoupLanguageSemantics.successor_csr); breadth_first_search uses it with
+engine="numba".
+
+Requires numpy and numba.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def expand_level(frontier, succ_matrix, seen):
+    """
+    Expand one BFS level.
+
+    Args:
+        frontier: int64 array of the states of the current level
+        succ_matrix: (n_states, width) int64 successor matrix
+        seen: uint8 array over the states, updated in place
+
+    Returns:
+        int64 array of the newly discovered states (the next level)
+    """
+    out = np.empty(frontier.size * succ_matrix.shape[1], dtype=np.int64)
+    n = 0
+    for i in range(frontier.size):
+        s = frontier[i]
+        for k in range(succ_matrix.shape[1]):
+            t = succ_matrix[s, k]
+            if t < 0:
+                break
+            if seen[t] == 0:
+                seen[t] = 1
+                out[n] = t
+                n += 1
+    return out[:n]
+
+
+def explore_levels(initial_states, succ_matrix):
+    """
+    Full BFS from initial_states with expand_level.
+
+    Returns:
+        uint8 array over the states, 1 for reachable states
+    """
+    seen = np.zeros(succ_matrix.shape[0], dtype=np.uint8)
+    frontier = np.asarray(initial_states, dtype=np.int64)
+    seen[frontier] = 1
+    while frontier.size:
+        frontier = expand_level(frontier, succ_matrix, seen)
+    return seen
+
+
+@njit(cache=True)
+def bfs_order(roots, indptr, indices):
+    """
+    BFS over a graph in CSR form: the successors of state s are
+    indices[indptr[s]:indptr[s + 1]].
+
+    Returns:
+        int64 array of the reachable states in discovery order (the order
+        in which breadth_first_search calls on_entry)
+    """
+    seen = np.zeros(indptr.size - 1, dtype=np.uint8)
+    order = np.empty(indptr.size - 1, dtype=np.int64)
+    tail = 0
+    for i in range(roots.size):
+        r = roots[i]
+        if seen[r] == 0:
+            seen[r] = 1
+            order[tail] = r
+            tail += 1
+    # order doubles as the FIFO queue: head walks behind tail
+    head = 0
+    while head < tail:
+        s = order[head]
+        head += 1
+        for k in range(indptr[s], indptr[s + 1]):
+            t = indices[k]
+            if seen[t] == 0:
+                seen[t] = 1
+                order[tail] = t
+                tail += 1
+    return order[:tail]
@@ -8,18 +8,134 @@ Architecture (matches whiteboard):
       -> BFS (existing breadth_first_search)
       -> detect accepting cycle -> OK or counter-example
 
-Cycle detection: after BFS explores the full composed state space,
-we search for accepting cycles using DFS on the visited states.
+Cycle detection: the BFS records the composed graph as it explores it
+(see ProductRecorder); then one Tarjan SCC pass finds the states lying on a cycle; an accepting
+one among them gives an accepting cycle, extracted by DFS. The BFS stops
+early at an accepting state with a self-loop or an accepting trap,
+which are accepting cycles by themselves.
 Counter-example = (prefix_trace, cyclic_suffix_trace).
 """
 
 from ls2rg import LS2RG
 from bfs import breadth_first_search
 from step_sync_composition import StepSyncComposition
-from collections import deque
+from array import array
 
 
-def verify_buchi(system_ls, property_ls):
+class StateInterner:
+    """
+    Numbers states 0, 1, 2, ... in order of first appearance, so later
+    passes work on int ids (hashing an int is cheaper than hashing a
+    composed (system_state, property_state) tuple).
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._states = []
+
+    def intern(self, state):
+        """Id of state, a new one if state was not seen before."""
+        state_id = self._ids.get(state)
+        if state_id is None:
+            state_id = len(self._states)
+            self._ids[state] = state_id
+            self._states.append(state)
+        return state_id
+
+    def id(self, state):
+        """Id of an already interned state."""
+        return self._ids[state]
+
+    def state(self, state_id):
+        """State with the given id."""
+        return self._states[state_id]
+
+    def __len__(self):
+        return len(self._states)
+
+
+class CycleSearchWorkspace:
+    """
+    Per-state buffers of the SCC pass, kept across verify_buchi calls so
+    a batch of verifications reuses them instead of allocating new ones
+    each time. They grow to the largest graph seen and never need a
+    reset: index values of a search start at next_index, so anything
+    smaller was left by an earlier search, and on_stack is all zeros
+    again when a search ends.
+    """
+
+    def __init__(self):
+        self.index = []
+        self.lowlink = []
+        self.on_stack = bytearray()
+        self.next_index = 0
+
+    def reserve(self, n):
+        """Make the buffers cover state ids 0..n-1."""
+        missing = n - len(self.index)
+        if missing > 0:
+            self.index.extend([-1] * missing)
+            self.lowlink.extend([0] * missing)
+            self.on_stack.extend(bytes(missing))
+
+
+class ProductRecorder(LS2RG):
+    """
+    LS2RG over a composition that records, while BFS walks it, the
+    flat integer form of the graph needed by the cycle search, so the
+    composed state space is traversed only once.
+
+    States are interned in BFS discovery order, which is also the order
+    in which BFS expands them, so the successors of state id u are
+    indices[indptr[u]:indptr[u + 1]] once u has been expanded.
+    accepting[u] is 1 for accepting states and parent[u] is the BFS
+    parent id (-1 at roots). accepting_loop is the id of the first
+    expanded accepting state with a self-loop (-1 while there is none),
+    read off the successor row as it is recorded.
+    """
+
+    def __init__(self, composed):
+        super().__init__(composed)
+        self.interner = StateInterner()
+        # Written once per state, read only to build the counter-example
+        # prefix: packed C ints (4 bytes each) rather than a list of objects
+        self.parent = array('i')
+        # Same for the CSR arrays, only ever appended to and indexed
+        self.indptr = array('i', [0])
+        self.indices = array('i')
+        self.accepting = bytearray()
+        self.accepting_loop = -1
+
+    def _record(self, state, parent_id):
+        """Intern state, recording its parent when it is new."""
+        state_id = self.interner.intern(state)
+        if state_id == len(self.parent):
+            self.parent.append(parent_id)
+            self.accepting.append(self._ls.is_accepting(state))
+        return state_id
+
+    def roots(self):
+        roots = super().roots()
+        for root in roots:
+            self._record(root, -1)
+        return roots
+
+    def neighbors(self, state):
+        # Not kept in the composition's successor cache: the CSR arrays
+        # are the only copy of the edges (each state is expanded once)
+        successors = list(self._ls.iter_successors(state))
+        state_id = self.interner.id(state)
+        start = len(self.indices)
+        for n in successors:
+            self.indices.append(self._record(n, state_id))
+        self.indptr.append(len(self.indices))
+        if (self.accepting_loop < 0 and self.accepting[state_id]
+                and state_id in self.indices[start:]):
+            self.accepting_loop = state_id
+        return successors
+
+
+def verify_buchi(system_ls, property_ls, workspace=None, engine="python"):
     """
     Verify that a system satisfies a Buchi property.
 
@@ -29,140 +145,275 @@ def verify_buchi(system_ls, property_ls):
     Args:
         system_ls: LanguageSemantics (Soup model, e.g. AB1-AB5)
         property_ls: ISoupSemantics (iSoup property, e.g. P1-P5)
+        workspace: Optional CycleSearchWorkspace reused across calls
+        engine: "python" (default) or "numba": SCC pass compiled with
+                numba (buchi_numba.cyclic_components, numpy and numba
+                required; the workspace is then unused)
 
     Returns:
         (satisfied, counter_example)
         - satisfied: True if no accepting cycle found
         - counter_example: None or (prefix, cycle)
     """
+    if engine not in ("python", "numba"):
+        raise ValueError(f"Unknown engine: {engine}")
+
     # Step 1: Compose system x property
     composed = StepSyncComposition(system_ls, property_ls)
 
-    # Step 2: Convert to RootedGraph
-    rg = LS2RG(composed)
+    # Step 2: Convert to RootedGraph, recording the graph as BFS walks it
+    rg = ProductRecorder(composed)
 
-    # Step 3: BFS to explore full state space and build parent map
-    parent_map = {}
-    all_states = []
+    # Step 3: BFS to explore full state space, or until an accepting
+    # state with a self-loop (seen by the recorder when it expands the
+    # state) or an accepting trap is reached: the property is then
+    # violated for sure
+    found = []
 
     def on_entry(state, opaque):
-        all_states.append(state)
+        if rg.accepting_loop >= 0:
+            return True
+        if composed.is_accepting(state) and composed.is_accepting_trap(state):
+            found.append(state)
+            return True
         return False  # Explore everything
 
-    _, visited = breadth_first_search(rg, on_entry, None)
+    breadth_first_search(rg, on_entry, None)
+    interner = rg.interner
+    parent = rg.parent
 
-    # Build adjacency + parent map from composed LS (for path reconstruction)
-    adjacency = {}
-    parent_map = {}
-    bfs_queue = deque()
+    # The BFS parents up to that state are already recorded
+    if rg.accepting_loop >= 0:
+        state = interner.state(rg.accepting_loop)
+        prefix = [interner.state(i) for i in _build_path(parent, rg.accepting_loop)]
+        return False, (prefix, [state, state])
+    if found:
+        return False, _trap_lasso(composed, parent, interner, interner.id(found[0]))
 
-    for init in composed.initials():
-        if init in visited:
-            parent_map[init] = None
-            bfs_queue.append(init)
+    # The whole graph was expanded: its CSR form is complete
+    indptr, indices, accepting = rg.indptr, rg.indices, rg.accepting
+    if 1 not in accepting:
+        # No accepting state reachable: no cycle search needed
+        return True, None
 
-    visited_bfs = set()
-    while bfs_queue:
-        current = bfs_queue.popleft()
-        if current in visited_bfs:
-            continue
-        visited_bfs.add(current)
+    # Step 4: Find accepting cycles
+    # An accepting state is on an accepting cycle iff it is on a cycle:
+    # one SCC pass instead of a DFS per accepting state
+    if engine == "numba":
+        component = _numba_cyclic_components(indptr, indices, accepting)
+    else:
+        component = _cyclic_components(indptr, indices, workspace, accepting)
+    # Only state ids from here on. The SCC pass stops at the first
+    # component holding an accepting state, so only the components found
+    # up to then are numbered: the first match is the smallest numbered
+    # accepting id, not necessarily the accepting cycle nearest the root
+    for acc_state in range(len(accepting)):
+        if accepting[acc_state] and component[acc_state]:
+            # DFS from acc_state inside its SCC, extracting the cycle back to acc_state
+            cycle = _find_cycle_from(acc_state, indptr, indices, component)
+            # Build prefix: path from initial to acc_state
+            prefix = _build_path(parent, acc_state)
+            return False, ([interner.state(i) for i in prefix],
+                           [interner.state(i) for i in cycle])
 
-        actions = composed.actions(current)
-        neighbors = []
-        for action in actions:
-            next_states = composed.execute(current, action)
-            neighbors.extend(next_states)
-        adjacency[current] = neighbors
+    return True, None
 
-        for n in neighbors:
-            if n not in visited_bfs:
-                if n not in parent_map:
-                    parent_map[n] = current
-                bfs_queue.append(n)
 
-    # Step 4: Find accepting cycles
-    # For each accepting state, do a DFS to see if we can reach it again
-    accepting_states = [s for s in visited if composed.is_accepting(s)]
+def _trap_lasso(composed, parent, interner, trap_id):
+    """
+    Counter-example through an accepting trap: the BFS path to it, then
+    first successors until a state repeats. All states after the trap are
+    accepting and every one has a successor, so this closes a cycle.
+    """
+    prefix = [interner.state(i) for i in _build_path(parent, trap_id)]
+    walk = [prefix[-1]]
+    position = {walk[0]: 0}
+    while True:
+        next_state = composed.successors(walk[-1])[0]
+        if next_state in position:
+            break
+        position[next_state] = len(walk)
+        walk.append(next_state)
 
-    for acc_state in accepting_states:
-        # DFS from acc_state through adjacency, looking for cycle back to acc_state
-        cycle = _find_cycle_from(acc_state, adjacency, visited)
-        if cycle is not None:
-            # Build prefix: path from initial to acc_state
-            prefix = _build_path(parent_map, acc_state)
-            return False, (prefix, cycle)
+    loop_start = position[next_state]
+    return (prefix + walk[1:loop_start + 1],
+            walk[loop_start:] + [next_state])
 
-    return True, None
 
+def _cyclic_components(indptr, indices, workspace=None, accepting=None):
+    """
+    Strongly connected components of the states lying on a cycle of the
+    graph: members of a component with more than one state, or with a
+    self-loop. Iterative Tarjan over the CSR graph (linear in the
+    edges).
+
+    With accepting (flags indexed by state id), the pass stops as soon
+    as it closes such a component holding an accepting state: the
+    components not closed yet are then left at 0.
 
-def _find_cycle_from(target, adjacency, all_visited):
+    Returns:
+        array indexed by state id: the component number (1, 2, ...) of
+        the states on a cycle, 0 for the others
+    """
+    # Flat arrays indexed by state id, from the workspace: a state is
+    # not yet indexed by this search while its index is below base
+    n = len(indptr) - 1
+    if workspace is None:
+        workspace = CycleSearchWorkspace()
+    workspace.reserve(n)
+    index = workspace.index
+    lowlink = workspace.lowlink
+    on_stack = workspace.on_stack
+    base = counter = workspace.next_index
+    # Next edge of each state to walk (position in indices)
+    cursor = indptr[:-1]
+    # Stacks of state ids: packed arrays, no int object kept per entry
+    scc_stack = array('i')
+    component = array('i', bytes(4 * n))
+    n_components = 0
+
+    for root in range(n):
+        if index[root] >= base:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        scc_stack.append(root)
+        on_stack[root] = 1
+        work = array('i', [root])
+
+        while work:
+            node = work[-1]
+            k = cursor[node]
+            end = indptr[node + 1]
+            while k < end:
+                next_state = indices[k]
+                k += 1
+                if index[next_state] < base:
+                    # Descend into next_state, resume node afterwards
+                    index[next_state] = lowlink[next_state] = counter
+                    counter += 1
+                    scc_stack.append(next_state)
+                    on_stack[next_state] = 1
+                    work.append(next_state)
+                    break
+                if on_stack[next_state] and index[next_state] < lowlink[node]:
+                    lowlink[node] = index[next_state]
+            else:
+                # All neighbors of node done
+                work.pop()
+                if work:
+                    caller = work[-1]
+                    if lowlink[node] < lowlink[caller]:
+                        lowlink[caller] = lowlink[node]
+                if lowlink[node] == index[node]:
+                    # node is the root of an SCC: pop it
+                    scc = []
+                    while True:
+                        member = scc_stack.pop()
+                        on_stack[member] = 0
+                        scc.append(member)
+                        if member == node:
+                            break
+                    if len(scc) > 1 or node in indices[indptr[node]:end]:
+                        n_components += 1
+                        for member in scc:
+                            component[member] = n_components
+                        if accepting is not None and any(accepting[m] for m in scc):
+                            # Accepting cycle found: leave on_stack all
+                            # zeros for the next search
+                            for member in scc_stack:
+                                on_stack[member] = 0
+                            workspace.next_index = counter
+                            return component
+            cursor[node] = k
+
+    workspace.next_index = counter
+    return component
+
+
+def _numba_cyclic_components(indptr, indices, accepting):
+    """_cyclic_components run by the numba kernel of buchi_numba."""
+    import numpy as np
+    from buchi_numba import cyclic_components
+
+    # The recorded arrays are shared with numpy, not copied
+    return cyclic_components(np.frombuffer(indptr, dtype=np.int32),
+                             np.frombuffer(indices, dtype=np.int32),
+                             np.frombuffer(accepting, dtype=np.uint8))
+
+
+def _find_cycle_from(target, indptr, indices, component=None):
     """
     DFS from target to find a path back to target (a cycle).
-    Returns the cycle path or None.
+    With component (see _cyclic_components), the DFS stays inside the
+    SCC of target: every cycle through target lies in it.
+    Returns the cycle path (state ids) or None.
     """
-    visited = set()
-    parent = {}
+    n = len(indptr) - 1
+    scc = component[target] if component is not None else None
+    # One bit per state (bit i & 7 of byte i >> 3), allocated per call
+    visited = bytearray((n + 7) >> 3)
+    cursor = indptr[:-1]
+
+    # The stack always holds the DFS path from target to its top: no
+    # parent array is needed to rebuild the cycle
 
-    stack = [(target, iter(adjacency.get(target, [])))]
-    visited.add(target)
+    stack = array('i', [target])
+    visited[target >> 3] |= 1 << (target & 7)
 
     while stack:
-        current, neighbors_iter = stack[-1]
-        try:
-            next_state = next(neighbors_iter)
-            if next_state == target:
-                # Found cycle! Build cycle path
-                cycle = _build_path_from_parent(parent, current, target)
-                cycle.append(target)  # Close the cycle
-                return cycle
-            if next_state not in visited and next_state in all_visited:
-                visited.add(next_state)
-                parent[next_state] = current
-                stack.append((next_state, iter(adjacency.get(next_state, []))))
-        except StopIteration:
+        current = stack[-1]
+        k = cursor[current]
+        if k == indptr[current + 1]:
             stack.pop()
+            continue
+        cursor[current] = k + 1
+        next_state = indices[k]
+        if next_state == target:
+            # Found cycle! The stack is the path target -> current
+            stack.append(target)  # Close the cycle
+            return stack.tolist()
+        if scc is not None and component[next_state] != scc:
+            continue
+        bit = 1 << (next_state & 7)
+        if not visited[next_state >> 3] & bit:
+            visited[next_state >> 3] |= bit
+            stack.append(next_state)
 
     return None
 
 
-def _build_path_from_parent(parent, end, start):
-    """Build path from start to end using parent dict."""
-    path = []
-    current = end
-    while current != start:
-        path.append(current)
-        current = parent.get(current)
-        if current is None:
-            break
-    path.append(start)
-    path.reverse()
-    return path
-
-
-def _build_path(parent_map, target):
-    """Build path from root to target using BFS parent map."""
+def _build_path(parent, target):
+    """Build path from root to target using BFS parent list (-1 at roots)."""
     path = []
     current = target
-    while current is not None:
+    while current != -1:
         path.append(current)
-        current = parent_map.get(current)
+        current = parent[current]
     path.reverse()
     return path
 
 
-def format_counter_example(ce):
-    """Format a counter-example (prefix, cycle) as a readable string."""
+def format_counter_example(ce, format_state=None):
+    """
+    Format a counter-example (prefix, cycle) as a readable string.
+
+    format_state optionally maps a system state to its printed form
+    (e.g. to decode packed states).
+    """
     if ce is None:
         return "No counter-example (property satisfied)"
 
+    if format_state is None:
+        format_state = lambda s: s
+
     prefix, cycle = ce
     lines = []
     lines.append("Prefix trace:")
     for i, (sys_state, prop_state) in enumerate(prefix):
-        lines.append(f"  {i}: {sys_state} [prop={prop_state}]")
+        lines.append(f"  {i}: {format_state(sys_state)} [prop={prop_state}]")
     lines.append("Cyclic suffix trace:")
     for i, (sys_state, prop_state) in enumerate(cycle):
         marker = " (loop)" if i == len(cycle) - 1 else ""
-        lines.append(f"  {i}: {sys_state} [prop={prop_state}]{marker}")
+        lines.append(f"  {i}: {format_state(sys_state)} [prop={prop_state}]{marker}")
     return "\n".join(lines)
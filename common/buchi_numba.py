@@ -0,0 +1,110 @@
+"""
+Numba-compiled cycle search for verify_buchi (engine="numba").
+
+The composed graph is given in CSR form as recorded by ProductRecorder:
+the successors of state u are indices[indptr[u]:indptr[u + 1]].
+cyclic_components is the same iterative Tarjan pass as
+buchi._cyclic_components (with the accepting early exit), run inside
+one @njit kernel.
+
+Requires numpy and numba.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def cyclic_components(indptr, indices, accepting):
+    """
+    Strongly connected components of the states lying on a cycle.
+    Stops as soon as such a component holds an accepting state
+    (accepting: uint8 flags indexed by state id).
+
+    Returns:
+        int32 array indexed by state id: the component number (1, 2, ...)
+        of the states on a cycle, 0 for the others (numbered in the same
+        order as buchi._cyclic_components)
+    """
+    n = indptr.size - 1
+    index = np.full(n, -1, dtype=np.int64)
+    lowlink = np.zeros(n, dtype=np.int64)
+    on_stack = np.zeros(n, dtype=np.uint8)
+    cursor = indptr[:-1].copy()
+    scc_stack = np.empty(n, dtype=np.int64)
+    work = np.empty(n, dtype=np.int64)
+    component = np.zeros(n, dtype=np.int32)
+    n_components = 0
+    counter = 0
+    scc_top = 0
+
+    for root in range(n):
+        if index[root] >= 0:
+            continue
+        index[root] = counter
+        lowlink[root] = counter
+        counter += 1
+        scc_stack[scc_top] = root
+        scc_top += 1
+        on_stack[root] = 1
+        work[0] = root
+        work_top = 1
+
+        while work_top > 0:
+            node = work[work_top - 1]
+            k = cursor[node]
+            end = indptr[node + 1]
+            descended = False
+            while k < end:
+                next_state = indices[k]
+                k += 1
+                if index[next_state] < 0:
+                    # Descend into next_state, resume node afterwards
+                    index[next_state] = counter
+                    lowlink[next_state] = counter
+                    counter += 1
+                    scc_stack[scc_top] = next_state
+                    scc_top += 1
+                    on_stack[next_state] = 1
+                    work[work_top] = next_state
+                    work_top += 1
+                    descended = True
+                    break
+                if on_stack[next_state] and index[next_state] < lowlink[node]:
+                    lowlink[node] = index[next_state]
+            cursor[node] = k
+            if descended:
+                continue
+
+            # All neighbors of node done
+            work_top -= 1
+            if work_top > 0:
+                caller = work[work_top - 1]
+                if lowlink[node] < lowlink[caller]:
+                    lowlink[caller] = lowlink[node]
+            if lowlink[node] == index[node]:
+                # node is the root of an SCC: pop it
+                start = scc_top
+                while True:
+                    start -= 1
+                    on_stack[scc_stack[start]] = 0
+                    if scc_stack[start] == node:
+                        break
+                cyclic = scc_top - start > 1
+                if not cyclic:
+                    for j in range(indptr[node], end):
+                        if indices[j] == node:
+                            cyclic = True
+                            break
+                if cyclic:
+                    n_components += 1
+                    found = False
+                    for j in range(start, scc_top):
+                        component[scc_stack[j]] = n_components
+                        if accepting[scc_stack[j]]:
+                            found = True
+                    if found:
+                        return component
+                scc_top = start
+
+    return component
@@ -5,9 +5,25 @@ Each property is a Buchi automaton wrapped in the LanguageSemantics interface.
 The iSoup state is the automaton state (0, 1, 2, "x", "y", etc.).
 Transitions are guarded by predicates on the SYSTEM state.
 Accepting states are marked for Buchi cycle detection.
+
+A guard is a pair of atomic proposition masks (required, forbidden):
+the transition is enabled when every required proposition holds and no
+forbidden one does. The propositions of a system state are computed
+once (see atomic_props), so checking a guard is two integer tests.
+The guards of each property state are further compiled into a table of
+the enabled transitions for every (packed system state, deadlock) pair,
+so enabled_transitions is a single lookup for those states; any other
+state has its guards evaluated.
 """
 
+from functools import lru_cache
+
 from languagesemantics import LanguageSemantics
+from ab_state import (
+    LOC_A_SHIFT, LOC_B_SHIFT, FA_SHIFT, FB_SHIFT,
+    LOC_A_MASK, LOC_B_MASK, FA_MASK, FB_MASK,
+    A_CS, B_CS, I, W, UP, KEY_DOMAIN,
+)
 
 
 class ISoupSemantics(LanguageSemantics):
@@ -18,14 +34,16 @@ class ISoupSemantics(LanguageSemantics):
     Subclasses define:
     - _initial: initial automaton state
     - _accepting: set of accepting states
-    - _transitions: dict {state: [(guard_fn, target_state), ...]}
-      where guard_fn takes (system_state, is_deadlock) -> bool
+    - _transitions: dict {state: [(required, forbidden, target_state), ...]}
+      where required/forbidden are masks of atomic propositions
     """
 
     def __init__(self):
         self._initial = None
         self._accepting = set()
         self._transitions = {}
+        self._traps = None
+        self._compiled = {}
 
     def initials(self):
         return [self._initial]
@@ -35,46 +53,137 @@ class ISoupSemantics(LanguageSemantics):
         return self._transitions.get(prop_state, [])
 
     def execute(self, prop_state, action):
-        """Action is a (guard_fn, target_state) tuple. Return [target_state]."""
-        _, target = action
-        return [target]
+        """Action is a (required, forbidden, target_state) tuple. Return [target_state]."""
+        return [action[2]]
 
     def is_accepting(self, prop_state):
         return prop_state in self._accepting
 
+    def is_accepting_trap(self, prop_state):
+        """
+        True for an accepting state whose only transition is an
+        unguarded self-loop (P1 and P2 state 0): once the automaton is
+        there it stays accepting forever, whatever the system does.
+        """
+        if self._traps is None:
+            self._traps = {
+                state for state in self._accepting
+                if self._transitions.get(state) == [(0, 0, state)]
+            }
+        return prop_state in self._traps
+
+    def _compile(self, prop_state):
+        """
+        Table of the enabled transitions of prop_state, indexed by
+        system_state + KEY_DOMAIN * is_deadlock.
+        """
+        transitions = self._transitions.get(prop_state, [])
+        table = []
+        for is_deadlock in (False, True):
+            for system_state in range(KEY_DOMAIN):
+                ap = atomic_props(system_state, is_deadlock)
+                table.append([
+                    transition for transition in transitions
+                    if ap & transition[0] == transition[0] and not ap & transition[1]
+                ])
+        return table
+
     def enabled_transitions(self, prop_state, system_state, is_deadlock):
         """Return transitions whose guard is satisfied by the system state."""
-        result = []
-        for guard, target in self._transitions.get(prop_state, []):
-            if guard(system_state, is_deadlock):
-                result.append((guard, target))
-        return result
+        # Packed state: a single lookup in the compiled table
+        if type(system_state) is int and 0 <= system_state < KEY_DOMAIN:
+            table = self._compiled.get(prop_state)
+            if table is None:
+                table = self._compiled[prop_state] = self._compile(prop_state)
+            return list(table[system_state + KEY_DOMAIN * is_deadlock])
+        # Any other state: evaluate the guards
+        ap = atomic_props(system_state, is_deadlock)
+        return [
+            transition for transition in self._transitions.get(prop_state, [])
+            if ap & transition[0] == transition[0] and not ap & transition[1]
+        ]
 
 
 # =============================================================================
-# Helper functions to read system state tuples
+# Helper functions to read packed system states (see ab_state)
 # =============================================================================
+# Models without flags (AB1) leave the flag bits at 0, i.e. DOWN
 
 def _alice_in_cs(s):
-    return s[0] == "CS"
+    return (s & LOC_A_MASK) == A_CS
 
 def _bob_in_cs(s):
-    return s[1] == "CS"
+    return (s & LOC_B_MASK) == B_CS
 
 def _both_in_cs(s):
     return _alice_in_cs(s) and _bob_in_cs(s)
 
 def _flag_alice(s):
-    return s[2] if len(s) > 2 else "DOWN"
+    return (s & FA_MASK) >> FA_SHIFT
 
 def _flag_bob(s):
-    return s[3] if len(s) > 3 else "DOWN"
+    return (s & FB_MASK) >> FB_SHIFT
 
 def _alice_loc(s):
-    return s[0]
+    return (s & LOC_A_MASK) >> LOC_A_SHIFT
 
 def _bob_loc(s):
-    return s[1]
+    return (s & LOC_B_MASK) >> LOC_B_SHIFT
+
+
+# =============================================================================
+# Atomic propositions
+# =============================================================================
+
+ALICE_CS = 1 << 0
+BOB_CS = 1 << 1
+BOTH_CS = 1 << 2
+FLAG_A_UP = 1 << 3
+FLAG_B_UP = 1 << 4
+ALICE_W = 1 << 5
+BOB_W = 1 << 6
+ALICE_I = 1 << 7
+BOB_I = 1 << 8
+DEADLOCK = 1 << 9
+
+
+def _state_props(s):
+    """Mask of the propositions holding in system state s (no DEADLOCK)."""
+    ap = 0
+    if _alice_in_cs(s):
+        ap |= ALICE_CS
+    if _bob_in_cs(s):
+        ap |= BOB_CS
+    if _both_in_cs(s):
+        ap |= BOTH_CS
+    if _flag_alice(s) == UP:
+        ap |= FLAG_A_UP
+    if _flag_bob(s) == UP:
+        ap |= FLAG_B_UP
+    if _alice_loc(s) == W:
+        ap |= ALICE_W
+    if _bob_loc(s) == W:
+        ap |= BOB_W
+    if _alice_loc(s) == I:
+        ap |= ALICE_I
+    if _bob_loc(s) == I:
+        ap |= BOB_I
+    return ap
+
+
+# Propositions of every packed state, indexed by the state
+_STATE_PROPS = tuple(_state_props(s) for s in range(KEY_DOMAIN))
+
+
+def atomic_props(system_state, is_deadlock):
+    """Mask of the propositions holding in system_state."""
+    if type(system_state) is int and 0 <= system_state < KEY_DOMAIN:
+        ap = _STATE_PROPS[system_state]
+    else:
+        ap = _state_props(system_state)
+    if is_deadlock:
+        return ap | DEADLOCK
+    return ap
 
 
 # =============================================================================
@@ -91,11 +200,11 @@ class P1Exclusion(ISoupSemantics):
         self._accepting = {0}
         self._transitions = {
             1: [
-                (lambda s, d: not _both_in_cs(s), 1),
-                (lambda s, d: _both_in_cs(s), 0),
+                (0, BOTH_CS, 1),
+                (BOTH_CS, 0, 0),
             ],
             0: [
-                (lambda s, d: True, 0),
+                (0, 0, 0),
             ],
         }
 
@@ -114,11 +223,11 @@ class P2Deadlock(ISoupSemantics):
         self._accepting = {0}
         self._transitions = {
             1: [
-                (lambda s, d: not d, 1),
-                (lambda s, d: d, 0),
+                (0, DEADLOCK, 1),
+                (DEADLOCK, 0, 0),
             ],
             0: [
-                (lambda s, d: True, 0),
+                (0, 0, 0),
             ],
         }
 
@@ -136,16 +245,16 @@ class P3AtLeastOneIn(ISoupSemantics):
         self._initial = "x"
         self._accepting = {"y"}
 
-        def q(s, d):
-            return _alice_in_cs(s) or _bob_in_cs(s)
+        # q: Alice or Bob in CS
+        q = ALICE_CS | BOB_CS
 
         self._transitions = {
             "x": [
-                (lambda s, d: True, "x"),
-                (lambda s, d: not q(s, d), "y"),
+                (0, 0, "x"),
+                (0, q, "y"),
             ],
             "y": [
-                (lambda s, d: not q(s, d), "y"),
+                (0, q, "y"),
             ],
         }
 
@@ -165,15 +274,15 @@ class P4WantsIn(ISoupSemantics):
         self._accepting = {1, 2}
         self._transitions = {
             0: [
-                (lambda s, d: True, 0),
-                (lambda s, d: _flag_alice(s) == "UP" and not _alice_in_cs(s), 1),
-                (lambda s, d: _flag_bob(s) == "UP" and not _bob_in_cs(s), 2),
+                (0, 0, 0),
+                (FLAG_A_UP, ALICE_CS, 1),
+                (FLAG_B_UP, BOB_CS, 2),
             ],
             1: [
-                (lambda s, d: not _alice_in_cs(s), 1),
+                (0, ALICE_CS, 1),
             ],
             2: [
-                (lambda s, d: not _bob_in_cs(s), 2),
+                (0, BOB_CS, 2),
             ],
         }
 
@@ -193,15 +302,15 @@ class P5UncontestedProgress(ISoupSemantics):
         self._accepting = {1, 2}
         self._transitions = {
             0: [
-                (lambda s, d: True, 0),
-                (lambda s, d: _alice_loc(s) == "W" and not _alice_in_cs(s) and _bob_loc(s) == "I", 1),
-                (lambda s, d: _bob_loc(s) == "W" and not _bob_in_cs(s) and _alice_loc(s) == "I", 2),
+                (0, 0, 0),
+                (ALICE_W | BOB_I, ALICE_CS, 1),
+                (BOB_W | ALICE_I, BOB_CS, 2),
             ],
             1: [
-                (lambda s, d: not _alice_in_cs(s), 1),
+                (0, ALICE_CS, 1),
             ],
             2: [
-                (lambda s, d: not _bob_in_cs(s), 2),
+                (0, BOB_CS, 2),
             ],
         }
 
@@ -210,8 +319,15 @@ class P5UncontestedProgress(ISoupSemantics):
 # Factory
 # =============================================================================
 
+@lru_cache(maxsize=None)
 def get_isoup_property(name):
-    """Return an ISoupSemantics for the given property name."""
+    """
+    Return the ISoupSemantics for the given property name.
+
+    One shared instance per name: a property is never modified once
+    built (its lookup tables only fill in lazily), so every composition
+    reuses the same transition tables.
+    """
     props = {
         "P1": P1Exclusion,
         "P2": P2Deadlock,
@@ -8,15 +8,29 @@ class LS2RG(RootedGraph):
     # ls : instance d'une classe qui implémente LanguageSemantics
     def __init__(self, ls):
         self._ls = ls  # Stocke la sémantique de langage
+        # Raccourci si la sémantique calcule directement les successeurs
+        # (ex. SoupLanguageSemantics compilée)
+        self._successors = getattr(ls, "successors", None)
 
     # Retourne les états initiaux (racines du graphe)
     def roots(self):
         return self._ls.initials()
 
+    # Graphe au format CSR (indptr, indices) si la sémantique sait le
+    # construire (SoupLanguageSemantics sur un domaine range(n)), sinon None
+    def csr(self):
+        successor_csr = getattr(self._ls, "successor_csr", None)
+        if successor_csr is None:
+            return None
+        return successor_csr()
+
     # Retourne les voisins d'un état (sommet)
     # Pour un état donné, calcule tous les états successeurs possibles
     # en exécutant toutes les actions possibles depuis cet état
     def neighbors(self, state):
+        if self._successors is not None:
+            return self._successors(state)
+
         successors = []
         # Récupère toutes les actions possibles depuis cet état
         actions = self._ls.actions(state)
@@ -1,3 +1,5 @@
+from collections import namedtuple
+
 from souplanguagesemantics import Piece, Soup, SoupLanguageSemantics
 from bfs import breadth_first_search
 from ls2rg import LS2RG
@@ -97,37 +99,40 @@ else:
 # Exemple 4: Programme plus complexe avec etats composites
 # ============================================================================
 
-# Etat: dictionnaire avec deux variables
-# Exemple: {"x": 0, "y": 0}
+# Etat: tuple nomme (immuable et hashable) avec deux variables
+# Exemple: GridState(x=0, y=0)
+# Chaque effet construit un nouveau tuple avec _replace : aucune copie
+# d'etat a faire, et l'etat peut servir de cle (visited, tables)
+GridState = namedtuple("GridState", ("x", "y"))
 
 inc_x = Piece("inc_x",
-              lambda s: {"x": s["x"] + 1, "y": s["y"]},
-              lambda s: s["x"] < 3)
+              lambda s: s._replace(x=s.x + 1),
+              lambda s: s.x < 3)
 
 inc_y = Piece("inc_y",
-              lambda s: {"x": s["x"], "y": s["y"] + 1},
-              lambda s: s["y"] < 3)
+              lambda s: s._replace(y=s.y + 1),
+              lambda s: s.y < 3)
 
 dec_x = Piece("dec_x",
-              lambda s: {"x": s["x"] - 1, "y": s["y"]},
-              lambda s: s["x"] > 0)
+              lambda s: s._replace(x=s.x - 1),
+              lambda s: s.x > 0)
 
 dec_y = Piece("dec_y",
-              lambda s: {"x": s["x"], "y": s["y"] - 1},
-              lambda s: s["y"] > 0)
+              lambda s: s._replace(y=s.y - 1),
+              lambda s: s.y > 0)
 
 # Programme avec etat initial
-grid_program = Soup([inc_x, inc_y, dec_x, dec_y], {"x": 0, "y": 0})
+grid_program = Soup([inc_x, inc_y, dec_x, dec_y], GridState(0, 0))
 grid_semantics = SoupLanguageSemantics(grid_program)
 
 print("\n\n=== Exemple 4: Grille 2D ===")
-state = {"x": 0, "y": 0}
+state = GridState(0, 0)
 print(f"Etat initial: {state}")
 actions = grid_semantics.actions(state)
 print(f"Actions possibles: {[a.name for a in actions]}")
 
 # Executer quelques actions
-state = {"x": 1, "y": 1}
+state = GridState(1, 1)
 print(f"\nEtat: {state}")
 actions = grid_semantics.actions(state)
 print(f"Actions possibles: {[a.name for a in actions]}")
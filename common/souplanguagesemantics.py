@@ -1,10 +1,12 @@
 from languagesemantics import LanguageSemantics
-from copy import deepcopy
 
 
 # Classe Piece pour representer une regle de transformation
 # Une piece contient un nom, une garde (condition) et un effet (transformation)
 class Piece:
+    # Pas de __dict__ par instance : attributs fixes
+    __slots__ = ('name', 'guard', 'effect')
+
     def __init__(self, name, effect, guard):
         """
         Constructeur d'une piece.
@@ -25,16 +27,36 @@ class Piece:
 # Classe Soup pour representer un programme
 # Contient une liste de pieces et un etat initial
 class Soup:
-    def __init__(self, pieces, init):
+    def __init__(self, pieces, init, domain=None):
         """
         Constructeur d'un programme Soup.
 
         Args:
             pieces: liste des pieces (regles)
             init: etat initial du programme
+            domain: optionnel, ensemble fini de tous les etats possibles.
+                    Permet de precalculer les pieces actives de chaque etat
         """
         self.pieces = pieces
         self.init = init
+        self.domain = domain
+        self._succ = None
+
+    # Compile le programme en une fonction successeurs (etat -> liste des
+    # etats suivants). Le code genere deroule la boucle sur les pieces :
+    # un test de garde par ligne, sans iteration ni acces aux attributs
+    def compile(self):
+        if self._succ is None:
+            namespace = {}
+            lines = ["def _succ(s):", "    out = []"]
+            for k, piece in enumerate(self.pieces):
+                namespace[f"g{k}"] = piece.guard
+                namespace[f"e{k}"] = piece.effect
+                lines.append(f"    if g{k}(s): out.append(e{k}(s))")
+            lines.append("    return out")
+            exec("\n".join(lines), namespace)
+            self._succ = namespace["_succ"]
+        return self._succ
 
     def __repr__(self):
         return f"Soup(pieces={[p.name for p in self.pieces]}, init={self.init})"
@@ -48,6 +70,24 @@ class SoupLanguageSemantics(LanguageSemantics):
     # Constructeur : initialise la semantique avec un programme Soup
     def __init__(self, soup):
         self.soup = soup
+        # Table de saut {etat: pieces actives} : chaque garde est evaluee
+        # une seule fois par etat du domaine au lieu d'a chaque visite.
+        # Sans domaine (etats quelconques, parfois non hashables) : pas de table
+        self._table = None
+        if soup.domain is not None:
+            self._table = {}
+            for state in soup.domain:
+                self._table[state] = [piece for piece in soup.pieces if piece.guard(state)]
+        # Successeurs de chaque etat du domaine, calcules une fois avec la
+        # fonction compilee du programme
+        self._succ_table = None
+        if soup.domain is not None:
+            succ = soup.compile()
+            self._succ_table = {state: succ(state) for state in soup.domain}
+        # Matrice des successeurs (numpy), construite au premier besoin
+        self._succ_matrix = None
+        # Meme relation au format CSR (numpy), construite au premier besoin
+        self._succ_csr = None
 
     # Retourne les etats initiaux : l'etat initial du programme
     def initials(self):
@@ -55,6 +95,12 @@ class SoupLanguageSemantics(LanguageSemantics):
 
     # Retourne toutes les pieces dont la garde est satisfaite pour l'etat donne
     def actions(self, state):
+        # Etat du domaine : une seule recherche dans la table
+        if self._table is not None:
+            enabled_pieces = self._table.get(state)
+            if enabled_pieces is not None:
+                return enabled_pieces
+
         enabled_pieces = []
 
         # Pour chaque piece du programme
@@ -65,6 +111,15 @@ class SoupLanguageSemantics(LanguageSemantics):
 
         return enabled_pieces
 
+    # Retourne directement les etats successeurs (sans passer par les
+    # actions), utilise par LS2RG quand la semantique le propose
+    def successors(self, state):
+        if self._succ_table is not None:
+            successors = self._succ_table.get(state)
+            if successors is not None:
+                return successors
+        return self.soup.compile()(state)
+
     # Execute une piece (action) sur un etat et retourne le nouvel etat
     def execute(self, state, action):
         # L'action est une Piece
@@ -73,3 +128,54 @@ class SoupLanguageSemantics(LanguageSemantics):
 
         # Retourne une liste contenant le nouvel etat
         return [new_state]
+
+    # Matrice numpy M des successeurs : M[s, k] est l'etat atteint depuis s
+    # par sa k-ieme piece active, -1 si s a moins de k+1 pieces actives.
+    # Necessite numpy et un domaine de la forme range(n) (etats entiers)
+    def successor_matrix(self):
+        if self._succ_matrix is None:
+            import numpy as np
+
+            domain = self.soup.domain
+            if not isinstance(domain, range) or domain.start != 0 or domain.step != 1:
+                raise ValueError("successor_matrix needs a Soup domain of the form range(n)")
+
+            matrix = np.full((len(domain), len(self.soup.pieces)), -1, dtype=np.int64)
+            for state in domain:
+                for k, piece in enumerate(self._table[state]):
+                    matrix[state, k] = piece.effect(state)
+            self._succ_matrix = matrix
+        return self._succ_matrix
+
+    # Relation successeur au format CSR (compressed sparse row) : les
+    # successeurs de s sont indices[indptr[s]:indptr[s + 1]], dans l'ordre
+    # de successors(s). Necessite numpy et un domaine range(n)
+    def successor_csr(self):
+        if self._succ_csr is None:
+            import numpy as np
+
+            domain = self.soup.domain
+            if not isinstance(domain, range) or domain.start != 0 or domain.step != 1:
+                raise ValueError("successor_csr needs a Soup domain of the form range(n)")
+
+            indptr = np.zeros(len(domain) + 1, dtype=np.int64)
+            indices = []
+            for state in domain:
+                indices.extend(self._succ_table[state])
+                indptr[state + 1] = len(indices)
+            self._succ_csr = (indptr, np.array(indices, dtype=np.int64))
+        return self._succ_csr
+
+    # Successeurs de tout un niveau BFS en une fois (tableau numpy d'etats).
+    # Retourne les successeurs distincts, tries, en retirant ceux deja
+    # marques dans visited (tableau de booleens indexe par etat) si fourni
+    def successors_batch(self, frontier, visited=None):
+        import numpy as np
+
+        successors = self.successor_matrix()[frontier].ravel()
+        successors = successors[successors >= 0]
+        # Retire les etats deja visites avant np.unique : seuls les
+        # candidats nouveaux du niveau sont tries et dedoublonnes
+        if visited is not None:
+            successors = successors[~visited[successors]]
+        return np.unique(successors)
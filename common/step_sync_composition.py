@@ -8,6 +8,10 @@ Composed state = (system_state, property_state)
 
 from languagesemantics import LanguageSemantics
 
+# Action returned by actions() when the system is stuck, compared by
+# identity (no system action can be this object)
+_DEADLOCK = object()
+
 
 class StepSyncComposition(LanguageSemantics):
     """
@@ -30,18 +34,72 @@ class StepSyncComposition(LanguageSemantics):
         """
         self.system = system_ls
         self.prop = property_ls
+        # Successor function of the system when it has one
+        # (SoupLanguageSemantics: a table precomputed per model, so every
+        # property composed with the same model reads the same lists)
+        self._system_successors = getattr(system_ls, "successors", None)
+        # Successor list of each composed state, computed once: the BFS
+        # and the adjacency pass of verify_buchi both ask for it
+        self._succ_cache = {}
+        # Deadlock status of each system state (many composed states
+        # share the same system state), from the successor function
+        self._deadlock_cache = {}
+        # (actions, is_deadlock) of each system state, for systems without
+        # a successor function (asked again for every property state)
+        self._step_cache = {}
+        # Property transition table, filled lazily: for each system state,
+        # {prop_state: targets of the enabled transitions}. The deadlock
+        # status is a function of the system state, so it is part of the
+        # row: the guards of a pair are evaluated once, however many
+        # composed states observe it
+        self._prop_table = {}
+        # Composed initial states, computed on the first initials() call
+        self._initials = None
+
+    def _system_step(self, sys_state):
+        """
+        (actions, is_deadlock) of the system from sys_state: the guards
+        are evaluated once for both (cached).
+        """
+        step = self._step_cache.get(sys_state)
+        if step is None:
+            sys_actions = self.system.actions(sys_state)
+            step = self._step_cache[sys_state] = (sys_actions, not sys_actions)
+        return step
+
+    def _next_props(self, prop_state, sys_state):
+        """Targets of the property transitions enabled by sys_state (cached)."""
+        row = self._prop_table.get(sys_state)
+        if row is None:
+            row = self._prop_table[sys_state] = {}
+        next_props = row.get(prop_state)
+        if next_props is None:
+            is_deadlock = self._is_deadlock(sys_state)
+            enabled = self.prop.enabled_transitions(prop_state, sys_state, is_deadlock)
+            next_props = row[prop_state] = tuple(next_prop for _, _, next_prop in enabled)
+        return next_props
+
+    def _is_deadlock(self, sys_state):
+        """True if the system has no action from sys_state (cached)."""
+        if self._system_successors is None:
+            return self._system_step(sys_state)[1]
+        is_deadlock = self._deadlock_cache.get(sys_state)
+        if is_deadlock is None:
+            is_deadlock = len(self._system_successors(sys_state)) == 0
+            self._deadlock_cache[sys_state] = is_deadlock
+        return is_deadlock
 
     def initials(self):
-        """Cartesian product of initial states."""
-        composed = []
-        for sys_init in self.system.initials():
-            for prop_init in self.prop.initials():
-                # Check which property transitions are enabled for the initial system state
-                is_deadlock = len(self.system.actions(sys_init)) == 0
-                enabled = self.prop.enabled_transitions(prop_init, sys_init, is_deadlock)
-                for _, next_prop in enabled:
-                    composed.append((sys_init, next_prop))
-        return composed
+        """Cartesian product of initial states (computed once, as a tuple)."""
+        if self._initials is None:
+            composed = []
+            for sys_init in self.system.initials():
+                for prop_init in self.prop.initials():
+                    # Check which property transitions are enabled for the initial system state
+                    for next_prop in self._next_props(prop_init, sys_init):
+                        composed.append((sys_init, next_prop))
+            self._initials = tuple(composed)
+        return self._initials
 
     def actions(self, composed_state):
         """
@@ -49,11 +107,11 @@ class StepSyncComposition(LanguageSemantics):
         If system is in deadlock, return a special deadlock marker.
         """
         sys_state, prop_state = composed_state
-        sys_actions = self.system.actions(sys_state)
+        sys_actions, is_deadlock = self._system_step(sys_state)
 
-        if not sys_actions:
+        if is_deadlock:
             # Deadlock: return special marker so property can observe it
-            return ["__deadlock__"]
+            return [_DEADLOCK]
 
         return sys_actions
 
@@ -63,29 +121,84 @@ class StepSyncComposition(LanguageSemantics):
         Returns list of (next_sys_state, next_prop_state) pairs.
         """
         sys_state, prop_state = composed_state
-        results = []
+        next_props = self._next_props
 
-        if action == "__deadlock__":
+        if action is _DEADLOCK:
             # System is stuck - let property observe the deadlock
-            enabled = self.prop.enabled_transitions(prop_state, sys_state, True)
-            for _, next_prop in enabled:
-                results.append((sys_state, next_prop))
-            return results
+            return [(sys_state, next_prop)
+                    for next_prop in next_props(prop_state, sys_state)]
 
-        # Execute system action
-        next_sys_states = self.system.execute(sys_state, action)
+        # Execute system action, then let the property observe each next
+        # system state: the whole list built in one comprehension
+        return [(next_sys, next_prop)
+                for next_sys in self.system.execute(sys_state, action)
+                for next_prop in next_props(prop_state, next_sys)]
 
+    def _iter_observe(self, prop_state, next_sys_states):
+        """Yield the composed states reached when the property observes each next system state."""
         for next_sys in next_sys_states:
-            # Check if next system state is a deadlock
-            is_deadlock = len(self.system.actions(next_sys)) == 0
             # Get property transitions enabled by the next system state
-            enabled = self.prop.enabled_transitions(prop_state, next_sys, is_deadlock)
-            for _, next_prop in enabled:
-                results.append((next_sys, next_prop))
+            # (deadlock included)
+            for next_prop in self._next_props(prop_state, next_sys):
+                yield (next_sys, next_prop)
 
-        return results
+    def iter_successors(self, composed_state):
+        """
+        Yield the successors of a composed state one at a time, in
+        actions() order, so a consumer that stops early skips the rest.
+        Served from the cache when successors() already computed them.
+
+        Each successor is yielded once, even when several actions lead to
+        the same system state: consumers never process duplicate edges.
+        """
+        successors = self._succ_cache.get(composed_state)
+        if successors is not None:
+            yield from successors
+            return
+        if self._system_successors is not None:
+            # All system moves at once from the shared successor table
+            sys_state, prop_state = composed_state
+            next_sys_states = self._system_successors(sys_state)
+            if next_sys_states:
+                candidates = self._iter_observe(prop_state, next_sys_states)
+            else:
+                # Stuck: the property observes the deadlock in place
+                candidates = ((sys_state, next_prop)
+                              for next_prop in self._next_props(prop_state, sys_state))
+        else:
+            candidates = (successor
+                          for action in self.actions(composed_state)
+                          for successor in self.execute(composed_state, action))
+
+        seen = set()
+        for successor in candidates:
+            if successor not in seen:
+                seen.add(successor)
+                yield successor
+
+    def successors(self, composed_state):
+        """
+        All successors of a composed state (every action executed), in
+        actions() order. Computed once per state, then served from cache;
+        LS2RG uses this method directly.
+        """
+        successors = self._succ_cache.get(composed_state)
+        if successors is None:
+            # Streamed straight into one list, no list per action
+            successors = list(self.iter_successors(composed_state))
+            self._succ_cache[composed_state] = successors
+        return successors
 
     def is_accepting(self, composed_state):
         """Check if the property component is in an accepting state."""
         _, prop_state = composed_state
         return self.prop.is_accepting(prop_state)
+
+    def is_accepting_trap(self, composed_state):
+        """
+        Check if the property component is an accepting trap: every
+        composed state reachable from here is accepting and has a
+        successor, so an accepting cycle is certain.
+        """
+        _, prop_state = composed_state
+        return self.prop.is_accepting_trap(prop_state)